@@ -0,0 +1,98 @@
+"""key candles on natural key and partition by year
+
+Replaces the random UUID primary key, the four single column indexes and the unique constraint with a primary key on
+(exchange, symbol, timeframe, timestamp), range-partitions the table by timestamp into one partition per UTC year and
+adds a BRIN index on timestamp. ``id`` is dropped, as nothing refers to a candle by it. Rows without a timestamp,
+exchange or symbol cannot be keyed and are dropped; rows without a timeframe were imported as 1m.
+
+Revision ID: 47d41b60f81f
+Revises: 8c1776aeac45
+Create Date: 2026-10-18 20:43:13.230913
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "47d41b60f81f"
+down_revision = "8c1776aeac45"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "exchange, symbol, timeframe, timestamp, open, close, high, low, volume"
+
+
+def upgrade() -> None:
+    op.rename_table("candles", "candles_unpartitioned")
+    op.execute("ALTER TABLE candles_unpartitioned RENAME CONSTRAINT candles_pkey TO candles_unpartitioned_pkey")
+    op.execute(
+        """
+        CREATE TABLE candles (
+            exchange VARCHAR NOT NULL,
+            symbol VARCHAR NOT NULL,
+            timeframe VARCHAR NOT NULL,
+            timestamp BIGINT NOT NULL,
+            open DOUBLE PRECISION,
+            close DOUBLE PRECISION,
+            high DOUBLE PRECISION,
+            low DOUBLE PRECISION,
+            volume DOUBLE PRECISION,
+            PRIMARY KEY (exchange, symbol, timeframe, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+        """
+    )
+    op.execute("CREATE INDEX ix_candles_timestamp_brin ON candles USING brin (timestamp)")
+
+    first, last = (
+        op.get_bind().execute(sa.text("SELECT min(timestamp), max(timestamp) FROM candles_unpartitioned")).one()
+    )
+    if first is not None:
+        for year in range(_year(first), _year(last) + 1):
+            start = int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp()) * 1000
+            end = int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp()) * 1000
+            op.execute(f"CREATE TABLE candles_{year} PARTITION OF candles FOR VALUES FROM ({start}) TO ({end})")
+
+    # ordered by the key so every partition starts out clustered on it
+    op.execute(
+        f"""
+        INSERT INTO candles ({COLUMNS})
+        SELECT exchange, symbol, coalesce(timeframe, '1m'), timestamp, open, close, high, low, volume
+        FROM candles_unpartitioned
+        WHERE exchange IS NOT NULL AND symbol IS NOT NULL AND timestamp IS NOT NULL
+        ORDER BY timestamp, exchange, symbol
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.drop_table("candles_unpartitioned")
+
+
+def downgrade() -> None:
+    op.rename_table("candles", "candles_partitioned")
+    op.execute("ALTER TABLE candles_partitioned RENAME CONSTRAINT candles_pkey TO candles_partitioned_pkey")
+    op.create_table(
+        "candles",
+        sa.Column("id", sa.UUID(), primary_key=True),
+        sa.Column("timestamp", sa.BigInteger()),
+        sa.Column("open", sa.Float()),
+        sa.Column("close", sa.Float()),
+        sa.Column("high", sa.Float()),
+        sa.Column("low", sa.Float()),
+        sa.Column("volume", sa.Float()),
+        sa.Column("exchange", sa.String()),
+        sa.Column("symbol", sa.String()),
+        sa.Column("timeframe", sa.String()),
+        sa.UniqueConstraint("exchange", "symbol", "timeframe", "timestamp", name="unique_candle_constraint"),
+    )
+    op.execute(
+        f"INSERT INTO candles ({COLUMNS}, id) SELECT {COLUMNS}, gen_random_uuid() FROM candles_partitioned"
+    )
+    for column in ("timestamp", "exchange", "symbol", "timeframe"):
+        op.create_index(f"ix_candles_{column}", "candles", [column])
+    op.drop_table("candles_partitioned")
+
+
+def _year(timestamp: int) -> int:
+    return datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).year
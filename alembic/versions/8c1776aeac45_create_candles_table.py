@@ -0,0 +1,42 @@
+"""create candles table
+
+The schema the candles table had before migrations were added. Databases created from the models at that time can
+be marked as being at this revision with ``alembic stamp 8c1776aeac45``.
+
+Revision ID: 8c1776aeac45
+Revises:
+Create Date: 2026-10-18 20:43:12.117402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8c1776aeac45"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "candles",
+        sa.Column("id", sa.UUID(), primary_key=True),
+        sa.Column("timestamp", sa.BigInteger()),
+        sa.Column("open", sa.Float()),
+        sa.Column("close", sa.Float()),
+        sa.Column("high", sa.Float()),
+        sa.Column("low", sa.Float()),
+        sa.Column("volume", sa.Float()),
+        sa.Column("exchange", sa.String()),
+        sa.Column("symbol", sa.String()),
+        sa.Column("timeframe", sa.String()),
+        sa.UniqueConstraint("exchange", "symbol", "timeframe", "timestamp", name="unique_candle_constraint"),
+    )
+    for column in ("timestamp", "exchange", "symbol", "timeframe"):
+        op.create_index(f"ix_candles_{column}", "candles", [column])
+
+
+def downgrade() -> None:
+    op.drop_table("candles")
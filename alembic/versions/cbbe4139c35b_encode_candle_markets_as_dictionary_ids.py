@@ -0,0 +1,135 @@
+"""encode candle markets as dictionary ids
+
+Moves the exchange, symbol and timeframe names out of every candle row into the ``instruments`` and ``timeframes``
+dictionary tables, keying candles on (instrument_id, timeframe_id, timestamp). The table is rewritten in timestamp
+order, like the previous revision, so the space of the dropped name columns is reclaimed and partitions stay
+clustered.
+
+Revision ID: cbbe4139c35b
+Revises: 47d41b60f81f
+Create Date: 2026-10-18 20:46:53.742093
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "cbbe4139c35b"
+down_revision = "47d41b60f81f"
+branch_labels = None
+depends_on = None
+
+VALUES = "timestamp, open, close, high, low, volume"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "instruments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("exchange", sa.String(), nullable=False),
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.UniqueConstraint("exchange", "symbol", name="unique_instrument_constraint"),
+    )
+    op.create_table(
+        "timeframes",
+        sa.Column("id", sa.SmallInteger(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+    )
+    op.execute("INSERT INTO instruments (exchange, symbol) SELECT DISTINCT exchange, symbol FROM candles ORDER BY 1, 2")
+    op.execute("INSERT INTO timeframes (name) SELECT DISTINCT timeframe FROM candles ORDER BY 1")
+
+    _rename_candles("candles_named")
+    op.execute(
+        """
+        CREATE TABLE candles (
+            instrument_id INTEGER NOT NULL REFERENCES instruments (id),
+            timeframe_id SMALLINT NOT NULL REFERENCES timeframes (id),
+            timestamp BIGINT NOT NULL,
+            open DOUBLE PRECISION,
+            close DOUBLE PRECISION,
+            high DOUBLE PRECISION,
+            low DOUBLE PRECISION,
+            volume DOUBLE PRECISION,
+            PRIMARY KEY (instrument_id, timeframe_id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+        """
+    )
+    op.execute("CREATE INDEX ix_candles_timestamp_brin ON candles USING brin (timestamp)")
+    _create_partitions("candles_named")
+    op.execute(
+        f"""
+        INSERT INTO candles (instrument_id, timeframe_id, {VALUES})
+        SELECT i.id, t.id, {", ".join(f"c.{column}" for column in VALUES.split(", "))}
+        FROM candles_named c
+        JOIN instruments i ON i.exchange = c.exchange AND i.symbol = c.symbol
+        JOIN timeframes t ON t.name = c.timeframe
+        ORDER BY c.timestamp, i.id
+        """
+    )
+    op.drop_table("candles_named")
+
+
+def downgrade() -> None:
+    _rename_candles("candles_encoded")
+    op.execute(
+        """
+        CREATE TABLE candles (
+            exchange VARCHAR NOT NULL,
+            symbol VARCHAR NOT NULL,
+            timeframe VARCHAR NOT NULL,
+            timestamp BIGINT NOT NULL,
+            open DOUBLE PRECISION,
+            close DOUBLE PRECISION,
+            high DOUBLE PRECISION,
+            low DOUBLE PRECISION,
+            volume DOUBLE PRECISION,
+            PRIMARY KEY (exchange, symbol, timeframe, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+        """
+    )
+    op.execute("CREATE INDEX ix_candles_timestamp_brin ON candles USING brin (timestamp)")
+    _create_partitions("candles_encoded")
+    op.execute(
+        f"""
+        INSERT INTO candles (exchange, symbol, timeframe, {VALUES})
+        SELECT i.exchange, i.symbol, t.name, {", ".join(f"c.{column}" for column in VALUES.split(", "))}
+        FROM candles_encoded c
+        JOIN instruments i ON i.id = c.instrument_id
+        JOIN timeframes t ON t.id = c.timeframe_id
+        ORDER BY c.timestamp, i.exchange, i.symbol
+        """
+    )
+    op.drop_table("candles_encoded")
+    op.drop_table("timeframes")
+    op.drop_table("instruments")
+
+
+def _rename_candles(name: str) -> None:
+    # renames the partitions and indexes along with the table, freeing their names for the rewritten table
+    bind = op.get_bind()
+    partitions = bind.execute(
+        sa.text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'candles'::regclass")
+    ).scalars()
+    for table in ["candles", *partitions]:
+        renamed = name + table.removeprefix("candles")
+        indexes = bind.execute(sa.text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": table})
+        for index in indexes.scalars().all():
+            op.execute(f"ALTER INDEX {index} RENAME TO {index.replace(table, renamed, 1)}")
+        op.execute(f"ALTER TABLE {table} RENAME TO {renamed}")
+
+
+def _create_partitions(source: str) -> None:
+    first, last = op.get_bind().execute(sa.text(f"SELECT min(timestamp), max(timestamp) FROM {source}")).one()
+    if first is None:
+        return
+    for year in range(_year(first), _year(last) + 1):
+        start = int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp()) * 1000
+        end = int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp()) * 1000
+        op.execute(f"CREATE TABLE candles_{year} PARTITION OF candles FOR VALUES FROM ({start}) TO ({end})")
+
+
+def _year(timestamp: int) -> int:
+    return datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).year
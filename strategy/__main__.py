@@ -0,0 +1,43 @@
+import click
+
+from strategy.modes import import_candles_mode, resample_mode
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command(name="import-candles")
+@click.argument("exchange", type=click.Choice(list(import_candles_mode.drivers)))
+@click.argument("start_date")
+@click.argument("symbols", nargs=-1, required=True)
+@click.option("--workers", default=8, show_default=True, help="Number of symbols imported at the same time.")
+@click.option(
+    "--fill/--no-fill",
+    default=True,
+    show_default=True,
+    help="Store flat candles for the minutes without trades within the exchange's trading sessions.",
+)
+def import_candles(exchange: str, start_date: str, symbols: tuple[str, ...], workers: int, fill: bool):
+    """Import 1m candles for SYMBOLS from EXCHANGE, starting at START_DATE (YYYY-MM-DD)."""
+    errors = import_candles_mode.run_many(
+        "cli", exchange, list(symbols), start_date, max_workers=workers, fill_gaps=fill
+    )
+    if errors:
+        raise click.ClickException(f"Failed to import {', '.join(errors)}")
+
+
+@cli.command(name="resample")
+@click.argument("exchange", type=click.Choice(list(import_candles_mode.drivers)))
+@click.argument("timeframe")
+@click.argument("symbols", nargs=-1, required=True)
+def resample(exchange: str, timeframe: str, symbols: tuple[str, ...]):
+    """Aggregate the stored 1m candles of SYMBOLS on EXCHANGE into TIMEFRAME candles (e.g. 5m, 1h, 1D)."""
+    for symbol in symbols:
+        bars = resample_mode.run(exchange, symbol, timeframe)
+        click.echo(f"{symbol}: {bars} {timeframe} candles")
+
+
+if __name__ == "__main__":
+    cli()
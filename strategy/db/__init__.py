@@ -1 +1,2 @@
 from .candle import Candle
+from .instrument import Instrument, Timeframe
@@ -1,22 +1,78 @@
-from sqlalchemy import UUID, BigInteger, Column, Float, String, UniqueConstraint
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ColumnElement,
+    Connection,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    and_,
+    false,
+    text,
+)
 
 from strategy.db.base import Base
+from strategy.db.instrument import Instrument, Timeframe, instrument_id, timeframe_id
 
 
 class Candle(Base):
+    """
+    One OHLCV candle. The table is keyed on the natural key (instrument, timeframe, timestamp), with the instrument
+    and timeframe stored as small integer ids into the ``instruments`` and ``timeframes`` tables, and
+    range-partitioned by timestamp into one partition per UTC year, created on demand by ``ensure_partitions``.
+    Within a partition rows arrive in roughly timestamp order, so a BRIN index serves time range scans that do not
+    filter on a market.
+    """
+
     __tablename__ = "candles"
 
-    id = Column(UUID, primary_key=True)
-    timestamp = Column(BigInteger, index=True)
+    instrument_id = Column(Integer, ForeignKey(Instrument.id), primary_key=True)
+    timeframe_id = Column(SmallInteger, ForeignKey(Timeframe.id), primary_key=True)
+    timestamp = Column(BigInteger, primary_key=True)
     open = Column(Float)
     close = Column(Float)
     high = Column(Float)
     low = Column(Float)
     volume = Column(Float)
-    exchange = Column(String(), index=True)
-    symbol = Column(String(), index=True)
-    timeframe = Column(String(), index=True)
 
     __table_args__ = (
-        UniqueConstraint("exchange", "symbol", "timeframe", "timestamp", name="unique_candle_constraint"),
+        Index("ix_candles_timestamp_brin", "timestamp", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
     )
+
+
+def market_clause(exchange: str, symbol: str, timeframe: str) -> ColumnElement[bool]:
+    """Filter on the candles of one market, given by name. Matches nothing if the market was never stored."""
+    ids = instrument_id(exchange, symbol), timeframe_id(timeframe)
+    if None in ids:
+        return false()
+    return and_(Candle.instrument_id == ids[0], Candle.timeframe_id == ids[1])
+
+
+# years whose partition is known to exist, so ensure_partitions only issues DDL once per process and year
+_partitions: set[int] = set()
+
+
+def ensure_partitions(connection: Connection, start_timestamp: int, end_timestamp: int) -> None:
+    """Create the yearly partitions of ``candles`` for the given range that do not exist yet."""
+    first_year = datetime.fromtimestamp(start_timestamp / 1000, tz=timezone.utc).year
+    last_year = datetime.fromtimestamp(end_timestamp / 1000, tz=timezone.utc).year
+    missing = [year for year in range(first_year, last_year + 1) if year not in _partitions]
+    if not missing:
+        return
+    # serialises concurrent importers creating the same partition
+    connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('candles_partitions'))"))
+    for year in missing:
+        start = int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp()) * 1000
+        end = int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp()) * 1000
+        connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {Candle.__tablename__}_{year} PARTITION OF {Candle.__tablename__} "
+                f"FOR VALUES FROM ({start}) TO ({end})"
+            )
+        )
+    _partitions.update(missing)
@@ -0,0 +1,64 @@
+import time
+
+from sqlalchemy import Column, Integer, SmallInteger, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+
+from strategy.db.base import Base, engine
+
+
+class Instrument(Base):
+    """A symbol on an exchange. Candles refer to it by id instead of repeating both names on every row."""
+
+    __tablename__ = "instruments"
+
+    id = Column(Integer, primary_key=True)
+    exchange = Column(String(), nullable=False)
+    symbol = Column(String(), nullable=False)
+
+    __table_args__ = (UniqueConstraint("exchange", "symbol", name="unique_instrument_constraint"),)
+
+
+class Timeframe(Base):
+    __tablename__ = "timeframes"
+
+    id = Column(SmallInteger, primary_key=True)
+    name = Column(String(), nullable=False, unique=True)
+
+
+# ids never change once assigned, so lookups are cached for the life of the process
+_instrument_ids: dict[tuple[str, str], int] = {}
+_timeframe_ids: dict[str, int] = {}
+# unknown names are not looked up again for MISSING_TTL seconds unless created, so queries for markets that were
+# never stored do not each cost a round trip, while markets stored by another process still show up
+MISSING_TTL = 60
+_missing: dict[tuple[type[Base], object], float] = {}
+
+
+def instrument_id(exchange: str, symbol: str, create: bool = False) -> int | None:
+    """The id of the instrument, registering it first with ``create``. None if it is unknown."""
+    return _dictionary_id(_instrument_ids, (exchange, symbol), Instrument, create, exchange=exchange, symbol=symbol)
+
+
+def timeframe_id(timeframe: str, create: bool = False) -> int | None:
+    """The id of the timeframe, registering it first with ``create``. None if it is unknown."""
+    return _dictionary_id(_timeframe_ids, timeframe, Timeframe, create, name=timeframe)
+
+
+def _dictionary_id(cache: dict, key, table: type[Base], create: bool, **values) -> int | None:
+    if key in cache:
+        return cache[key]
+    if not create and _missing.get((table, key), 0) > time.monotonic():
+        return None
+    with engine.begin() as connection:
+        if create:
+            connection.execute(insert(table).values(**values).on_conflict_do_nothing())
+        id_ = connection.execute(
+            select(table.id).where(*(getattr(table, name) == value for name, value in values.items()))
+        ).scalar()
+    if id_ is None:
+        _missing[(table, key)] = time.monotonic() + MISSING_TTL
+    else:
+        cache[key] = id_
+        _missing.pop((table, key), None)
+    return id_
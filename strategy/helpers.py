@@ -1,6 +1,10 @@
 import uuid
+from datetime import datetime, timezone
+from typing import Iterable
 
 import arrow
+import numpy as np
+import numpy.typing as npt
 
 
 def generate_unique_id():
@@ -16,7 +20,41 @@ def timestamp_to_arrow(timestamp: int) -> arrow.arrow.Arrow:
 
 
 def timestamp_to_time(timestamp: int) -> str:
-    return str(arrow.get(timestamp / 1000))
+    return timestamp_to_datetime(timestamp).isoformat()
+
+
+def timestamp_to_datetime(timestamp: int) -> datetime:
+    return datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+
+
+def iso_to_timestamps(iso_times: Iterable[str]) -> npt.NDArray[np.int64]:
+    """
+    Millisecond timestamps of ISO 8601 UTC times such as "2024-01-02T14:30:00Z", parsed by numpy in one call
+    instead of one Arrow object per time. Times may end in "Z", "+00:00" or have no offset at all.
+    """
+    naive = [time[:-1] if time.endswith("Z") else time.removesuffix("+00:00") for time in iso_times]
+    return np.array(naive, dtype="datetime64[ms]").astype(np.int64)
+
+
+def timestamps_to_iso(timestamps: npt.ArrayLike) -> npt.NDArray[np.str_]:
+    """ISO 8601 UTC times with second precision, e.g. "2024-01-02T14:30:00Z", of millisecond timestamps."""
+    return np.datetime_as_string(timestamps_to_datetime64(timestamps), unit="s", timezone="UTC")
+
+
+def timestamps_to_datetime64(timestamps: npt.ArrayLike) -> npt.NDArray[np.datetime64]:
+    return np.asarray(timestamps, dtype=np.int64).astype("datetime64[ms]")
+
+
+def datetime64_to_timestamps(times: npt.ArrayLike) -> npt.NDArray[np.int64]:
+    return np.asarray(times, dtype="datetime64[ms]").astype(np.int64)
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Length of a timeframe such as "1m", "15m", "1h" or "1D" in milliseconds."""
+    units = {"m": 60_000, "h": 3_600_000, "D": 86_400_000}
+    if len(timeframe) < 2 or timeframe[-1] not in units or not timeframe[:-1].isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(timeframe[:-1]) * units[timeframe[-1]]
 
 
 def date_diff_in_days(date1: arrow.arrow.Arrow, date2: arrow.arrow.Arrow) -> int:
@@ -1,13 +1,13 @@
-import numpy as np
 import numpy.typing as npt
 import talib
 
 from strategy.db.candle import Candle
+from strategy.store.candles import CandleStore, to_candle_store
+from strategy.store.memoize import memoized
 
 
-def adx(candles: list[Candle], period: int = 14) -> float | npt.NDArray:
-    high = np.array([c.high for c in candles])
-    low = np.array([c.low for c in candles])
-    close = np.array([c.close for c in candles])
-    res = talib.ADX(high, low, close, timeperiod=period)
+@memoized
+def adx(candles: list[Candle] | CandleStore, period: int = 14) -> float | npt.NDArray:
+    candles = to_candle_store(candles)
+    res = talib.ADX(candles.high, candles.low, candles.close, timeperiod=period)
     return res
@@ -0,0 +1,2 @@
+from .adx import IncrementalADX
+from .base import IncrementalIndicator
@@ -0,0 +1,84 @@
+from strategy.db.candle import Candle
+from strategy.indicators.incremental.base import IncrementalIndicator
+
+
+class IncrementalADX(IncrementalIndicator):
+    """
+    Streaming ADX using the same Wilder smoothing as ``talib.ADX``: the first ``period - 1`` directional movements
+    and true ranges are summed, the following ``period`` bars are Wilder-smoothed and their DX averaged to seed the
+    ADX, which is then smoothed as ``(adx * (period - 1) + dx) / period``. The first value is available after
+    ``2 * period`` candles, matching TA-Lib's lookback.
+    """
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        if period < 2:
+            raise ValueError("period must be at least 2")
+        self.period = period
+        self.reset()
+
+    def reset(self) -> None:
+        self.value = float("nan")
+        self._count = 0
+        self._prev_high = 0.0
+        self._prev_low = 0.0
+        self._prev_close = 0.0
+        self._plus_dm = 0.0
+        self._minus_dm = 0.0
+        self._tr = 0.0
+        self._sum_dx = 0.0
+
+    def update(self, candle: Candle) -> float:
+        high, low, close = candle.high, candle.low, candle.close
+        period = self.period
+        count = self._count
+        self._count += 1
+
+        if count == 0:
+            self._prev_high, self._prev_low, self._prev_close = high, low, close
+            return self.value
+
+        diff_plus = high - self._prev_high
+        diff_minus = self._prev_low - low
+        true_range = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_high, self._prev_low, self._prev_close = high, low, close
+
+        if count >= period:
+            self._minus_dm -= self._minus_dm / period
+            self._plus_dm -= self._plus_dm / period
+            self._tr -= self._tr / period
+        if 0 < diff_minus and diff_plus < diff_minus:
+            self._minus_dm += diff_minus
+        elif 0 < diff_plus and diff_minus < diff_plus:
+            self._plus_dm += diff_plus
+        self._tr += true_range
+
+        if count < period:
+            return self.value
+
+        dx = self._dx()
+        if count < 2 * period - 1:
+            if dx is not None:
+                self._sum_dx += dx
+        elif count == 2 * period - 1:
+            if dx is not None:
+                self._sum_dx += dx
+            self.value = self._sum_dx / period
+        elif dx is not None:
+            self.value = (self.value * (period - 1) + dx) / period
+        return self.value
+
+    def _dx(self) -> float | None:
+        if _is_zero(self._tr):
+            return None
+        minus_di = 100 * self._minus_dm / self._tr
+        plus_di = 100 * self._plus_dm / self._tr
+        di_sum = minus_di + plus_di
+        if _is_zero(di_sum):
+            return None
+        return 100 * abs(minus_di - plus_di) / di_sum
+
+
+def _is_zero(value: float) -> bool:
+    # same tolerance as TA-Lib's TA_IS_ZERO
+    return -1e-14 < value < 1e-14
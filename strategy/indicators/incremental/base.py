@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+
+from strategy.db.candle import Candle
+
+
+class IncrementalIndicator(ABC):
+    """
+    An indicator that keeps its own state and is updated with one candle at a time in O(1), instead of being
+    recomputed over the whole history on every bar. ``value`` is NaN until enough candles have been seen.
+    """
+
+    def __init__(self):
+        self.value = float("nan")
+
+    @abstractmethod
+    def update(self, candle: Candle) -> float:
+        pass
+
+    @abstractmethod
+    def reset(self) -> None:
+        pass
@@ -0,0 +1,161 @@
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import numpy.typing as npt
+
+# days the NYSE closed outside its holiday rules
+NYSE_SPECIAL_CLOSURES = {
+    date(2001, 9, 11),
+    date(2001, 9, 12),
+    date(2001, 9, 13),
+    date(2001, 9, 14),
+    date(2004, 6, 11),
+    date(2007, 1, 2),
+    date(2012, 10, 29),
+    date(2012, 10, 30),
+    date(2018, 12, 5),
+    date(2025, 1, 9),
+}
+
+
+class MarketCalendar(ABC):
+    """When a market trades, as at most one session per calendar day in the market's timezone."""
+
+    timezone = ZoneInfo("UTC")
+
+    @abstractmethod
+    def session(self, day: date) -> tuple[int, int] | None:
+        """The ``(open, close)`` timestamps of the session on ``day``, close exclusive, or None when closed."""
+
+    def sessions(self, start_timestamp: int, end_timestamp: int) -> list[tuple[int, int]]:
+        """Every session overlapping ``start_timestamp`` to ``end_timestamp`` inclusive."""
+        day = self._local_date(start_timestamp)
+        last_day = self._local_date(end_timestamp)
+        sessions = []
+        while day <= last_day:
+            session = self.session(day)
+            if session is not None and session[1] > start_timestamp and session[0] <= end_timestamp:
+                sessions.append(session)
+            day += timedelta(days=1)
+        return sessions
+
+    def trading_minutes(
+        self, start_timestamp: int, end_timestamp: int, timeframe_ms: int = 60_000
+    ) -> npt.NDArray[np.int64]:
+        """The open times of the bars from ``start_timestamp`` to ``end_timestamp`` that fall within a session."""
+        bars = []
+        for open_, close in self.sessions(start_timestamp, end_timestamp):
+            first = open_ + max(0, -(-(start_timestamp - open_) // timeframe_ms)) * timeframe_ms
+            bars.append(np.arange(first, min(close, end_timestamp + 1), timeframe_ms, dtype=np.int64))
+        return np.concatenate(bars) if bars else np.empty(0, dtype=np.int64)
+
+    def in_session(self, timestamps: npt.ArrayLike) -> npt.NDArray[np.bool_]:
+        """Whether each of the sorted ``timestamps`` falls within a session."""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if not len(timestamps):
+            return np.zeros(0, dtype=np.bool_)
+        sessions = np.array(self.sessions(int(timestamps[0]), int(timestamps[-1])), dtype=np.int64).reshape(-1, 2)
+        if not len(sessions):
+            return np.zeros(len(timestamps), dtype=np.bool_)
+        i = np.searchsorted(sessions[:, 0], timestamps, side="right") - 1
+        return (i >= 0) & (timestamps < sessions[np.maximum(i, 0), 1])
+
+    def _local_date(self, timestamp: int) -> date:
+        return datetime.fromtimestamp(timestamp / 1000, tz=self.timezone).date()
+
+    def _timestamp(self, day: date, local_time: time) -> int:
+        return int(datetime.combine(day, local_time, tzinfo=self.timezone).timestamp()) * 1000
+
+
+class AlwaysOpenCalendar(MarketCalendar):
+    """A market trading around the clock, such as crypto, with one session per UTC day."""
+
+    def session(self, day: date) -> tuple[int, int]:
+        open_ = self._timestamp(day, time(0, 0))
+        return open_, open_ + 86_400_000
+
+
+class NYSECalendar(MarketCalendar):
+    """
+    New York Stock Exchange trading days and hours, computed offline from the exchange's holiday and early close
+    rules. Sessions are 9:30 to 16:00 New York time (13:00 on early close days), or 4:00 to 20:00 (17:00) with
+    ``extended_hours``.
+    """
+
+    timezone = ZoneInfo("America/New_York")
+
+    def __init__(self, extended_hours: bool = False):
+        self.extended_hours = extended_hours
+        if extended_hours:
+            self.open, self.close, self.early_close = time(4, 0), time(20, 0), time(17, 0)
+        else:
+            self.open, self.close, self.early_close = time(9, 30), time(16, 0), time(13, 0)
+
+    def session(self, day: date) -> tuple[int, int] | None:
+        if day.weekday() >= 5 or day in nyse_holidays(day.year):
+            return None
+        close = self.early_close if day in nyse_early_closes(day.year) else self.close
+        return self._timestamp(day, self.open), self._timestamp(day, close)
+
+
+@lru_cache
+def nyse_holidays(year: int) -> frozenset[date]:
+    holidays = {
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _last_weekday(year, 5, 0),  # Memorial Day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),
+    }
+    # New Year's Day falling on a Saturday is not made up on the Friday before
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+    if year >= 1998:
+        holidays.add(_nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+    holidays.update(day for day in NYSE_SPECIAL_CLOSURES if day.year == year)
+    return frozenset(holidays)
+
+
+@lru_cache
+def nyse_early_closes(year: int) -> frozenset[date]:
+    candidates = [date(year, 7, 3), _nth_weekday(year, 11, 3, 4) + timedelta(days=1), date(year, 12, 24)]
+    return frozenset(day for day in candidates if day.weekday() < 5 and day not in nyse_holidays(year))
+
+
+def _observed(day: date) -> date:
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    # anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    m = (32 + 2 * e + 2 * i - h - k) % 7
+    n = (a + 11 * h + 22 * m) // 451
+    month, day = divmod(h + m - 7 * n + 114, 31)
+    return date(year, month, day + 1)
@@ -0,0 +1,20 @@
+import numpy as np
+import numpy.typing as npt
+
+
+def max_drawdown(equity_curve: npt.ArrayLike) -> float:
+    equity_curve = np.asarray(equity_curve, dtype=np.float64)
+    if not len(equity_curve):
+        return 0.0
+    peaks = np.maximum.accumulate(equity_curve)
+    return float(np.max((peaks - equity_curve) / peaks))
+
+
+def sharpe_ratio(returns: npt.ArrayLike, periods_per_year: int = 252) -> float:
+    returns = np.asarray(returns, dtype=np.float64)
+    if len(returns) < 2:
+        return 0.0
+    std = np.std(returns, ddof=1)
+    if std == 0:
+        return 0.0
+    return float(np.mean(returns) / std * np.sqrt(periods_per_year))
@@ -6,6 +6,7 @@ from tqdm import tqdm
 
 import strategy.helpers as sh
 from strategy.db.candle import Candle
+from strategy.store.candles import CandleRow, CandleStore, to_candle_store
 from strategy.strategy import Order, Strategy
 
 
@@ -33,10 +34,12 @@ class Backtester:
         self.candles = []
         self.last_order: Order | None = None
 
-    def backtest(self, candles: list[Candle]):
+    def backtest(self, candles: list[Candle] | CandleStore):
         self.candles = candles
-        for i, candle in tqdm(enumerate(candles), total=len(candles), desc="Backtesting Candles"):
-            self.strategy.store.candles.add_candle(candle)
+        # a store is read row by row from its columns, without building a Candle per row
+        rows = candles.rows() if isinstance(candles, CandleStore) else candles
+        for i, candle in tqdm(enumerate(rows), total=len(candles), desc="Backtesting Candles"):
+            self.strategy.store.add_candle(candle)
 
             if self.strategy.should_long() and self.position is None:
                 self.enter_long(self.strategy.go_long())
@@ -45,9 +48,18 @@ class Backtester:
             if i == len(candles) - 1 or self.should_exit_position(candle):
                 self.exit_position(candle)
 
-            daily_return = (self.balance - self.equity_curve[-1]) / self.equity_curve[-1]
+            equity = self.balance + self.position_value(candle.close)
+            daily_return = (equity - self.equity_curve[-1]) / self.equity_curve[-1]
             self.daily_returns.append(daily_return)
-            self.equity_curve.append(self.balance)
+            self.equity_curve.append(equity)
+
+    def position_value(self, price: float) -> float:
+        """The open position marked to ``price``: what selling a long brings in, or buying back a short costs."""
+        if self.position == "long":
+            return self.last_order.quantity * price
+        if self.position == "short":
+            return -(self.last_order.quantity * price)
+        return 0.0
 
     def enter_long(self, order: Order) -> None:
         self.position = "long"
@@ -57,18 +69,18 @@ class Backtester:
         self.balance -= order.price * order.quantity
         self.last_order = order
 
-    def exit_long(self, candle: Candle) -> None:
+    def exit_long(self, candle: Candle | CandleRow) -> None:
         exit_price = candle.close
         trade_pnl = (exit_price - self.entry_price) * self.last_order.quantity
         self.pnl += trade_pnl
-        self.balance += trade_pnl
+        self.balance += exit_price * self.last_order.quantity
         self.trades.append(
             Trade(
                 type="long",
                 entry_price=self.entry_price,
                 exit_price=exit_price,
                 pnl=trade_pnl,
-                timestamp=sh.timestamp_to_arrow(candle.timestamp).datetime,
+                timestamp=sh.timestamp_to_datetime(candle.timestamp),
             )
         )
         self.position = None
@@ -81,32 +93,37 @@ class Backtester:
         self.balance += order.price * order.quantity
         self.last_order = order
 
-    def exit_short(self, candle: Candle) -> None:
+    def exit_short(self, candle: Candle | CandleRow) -> None:
         exit_price = candle.close
         trade_pnl = (self.entry_price - exit_price) * self.last_order.quantity
         self.pnl += trade_pnl
-        self.balance += trade_pnl
+        self.balance -= exit_price * self.last_order.quantity
         self.trades.append(
             Trade(
                 type="short",
                 entry_price=self.entry_price,
                 exit_price=exit_price,
                 pnl=trade_pnl,
-                timestamp=sh.timestamp_to_arrow(candle.timestamp).datetime,
+                timestamp=sh.timestamp_to_datetime(candle.timestamp),
             )
         )
+        self.position = None
 
-    def should_exit_position(self, candle: Candle) -> bool:
+    def should_exit_position(self, candle: Candle | CandleRow) -> bool:
         should_exit = False
-        if self.stop_loss and candle.low <= self.stop_loss:
+        if self.stop_loss and self.position == "short" and candle.high >= self.stop_loss:
+            should_exit = True
+        elif self.stop_loss and self.position != "short" and candle.low <= self.stop_loss:
+            should_exit = True
+        elif self.take_profit and self.position == "short" and candle.low <= self.take_profit:
             should_exit = True
-        elif self.take_profit and candle.high >= self.take_profit:
+        elif self.take_profit and self.position != "short" and candle.high >= self.take_profit:
             should_exit = True
         elif self.strategy.should_cancel_entry():
             should_exit = True
         return should_exit
 
-    def exit_position(self, candle: Candle):
+    def exit_position(self, candle: Candle | CandleRow):
         if self.position == "long":
             self.exit_long(candle)
         elif self.position == "short":
@@ -116,7 +133,7 @@ class Backtester:
         import quantstats as qs
 
         qs.extend_pandas()
-        dates = [sh.timestamp_to_arrow(candle.timestamp).datetime for candle in self.candles]
-        returns = pd.Series(self.daily_returns, index=pd.to_datetime(dates))
+        dates = sh.timestamps_to_datetime64(to_candle_store(self.candles).timestamp)
+        returns = pd.Series(self.daily_returns, index=pd.DatetimeIndex(dates).tz_localize("UTC"))
         qs.reports.html(returns, output="backtest_Report.html", title="backtest performance")
         qs.reports.full(returns)
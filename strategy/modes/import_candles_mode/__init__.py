@@ -1,30 +1,50 @@
-import time
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, List, Union
 
 import arrow
-import pydash
+import numpy as np
+import numpy.typing as npt
 from loguru import logger
-from sqlalchemy import asc, or_
+from sqlalchemy import asc
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.future import select
 
-from strategy.db.base import SessionLocal
-from strategy.db.candle import Candle
-from strategy.helpers import (
-    arrow_to_timestamp,
-    date_diff_in_days,
-    generate_unique_id,
-    now_to_timestamp,
-    timestamp_to_arrow,
-    timestamp_to_time,
-)
+from strategy.db.base import SessionLocal, engine, session_scope
+from strategy.db.candle import Candle, ensure_partitions, market_clause
+from strategy.db.instrument import instrument_id, timeframe_id
+from strategy.helpers import arrow_to_timestamp, timestamp_to_time
+from strategy.market_calendar import MarketCalendar
 from strategy.modes.import_candles_mode.drivers.alpaca import AlpacaExchange
 from strategy.modes.import_candles_mode.drivers.base_candles_exchange import CandleExchange
+from strategy.modes.import_candles_mode.planner import get_coverage, plan_missing_windows
+from strategy.modes.import_candles_mode.rate_limiter import TokenBucket
+from strategy.store.cache import candle_cache
+from strategy.store.candles import COLUMNS as CANDLE_COLUMNS
 
 drivers: dict[str, type(CandleExchange)] = {"alpaca": AlpacaExchange}
 
-
-def run(client_id: str, exchange: str, symbol: str, start_date_str: str, mode: str = "candles"):
+CANDLE_NATURAL_KEY = ["instrument_id", "timeframe_id", "timestamp"]
+
+
+def run(
+    client_id: str,
+    exchange: str,
+    symbol: str,
+    start_date_str: str,
+    mode: str = "candles",
+    fill_gaps: bool = True,
+    driver: CandleExchange | None = None,
+):
+    """
+    Import the 1m candles of ``symbol`` from ``start_date_str`` up to the last complete minute, requesting only
+    what is not stored yet. With ``fill_gaps`` the minutes without a trade inside the trading sessions of the
+    driver's calendar are stored as flat zero-volume candles; otherwise only the candles the exchange returns are
+    stored, and gaps between the first and last stored candle are not requested again. Requests go through
+    ``driver`` if one is given, which is left open for other imports to share; otherwise a driver limited to the
+    exchange's rate is created for this import and closed afterwards.
+    """
     today = arrow_to_timestamp(arrow.utcnow().floor("day"))
     start_timestamp = arrow_to_timestamp(arrow.get(start_date_str, "YYYY-MM-DD"))
     if start_timestamp == today or start_timestamp > today:
@@ -32,62 +52,126 @@ def run(client_id: str, exchange: str, symbol: str, start_date_str: str, mode: s
 
     symbol = symbol.upper()
 
-    until_date = arrow.utcnow().floor("day")
-    start_date = timestamp_to_arrow(start_timestamp)
-    days_count = date_diff_in_days(start_date, until_date)
-    candles_count = days_count * 1440
-    driver = drivers[exchange]()
-
-    session = SessionLocal()
-
-    for _i in range(candles_count):
-        temp_start_timestamp = arrow_to_timestamp(start_date)
-        temp_end_timestamp = temp_start_timestamp + (driver.count - 1) * 60_000
-
-        if temp_start_timestamp > now_to_timestamp():
-            break
-
-        count = (
-            session.query(Candle)
-            .filter(
-                Candle.exchange == exchange,
-                Candle.symbol == symbol,
-                or_(Candle.timeframe == "1m", Candle.timeframe.is_(None)),
-                Candle.timestamp.between(temp_start_timestamp, temp_end_timestamp),
+    # the last complete minute
+    end_timestamp = arrow.utcnow().floor("minute").int_timestamp * 1000 - 60_000
+    if driver is None:
+        with drivers[exchange]() as driver:
+            driver.limiter = TokenBucket(driver.rate_limit_per_second)
+            _import_symbol(driver, exchange, symbol, start_timestamp, end_timestamp, fill_gaps)
+    else:
+        _import_symbol(driver, exchange, symbol, start_timestamp, end_timestamp, fill_gaps)
+
+
+def _import_symbol(
+    driver: CandleExchange, exchange: str, symbol: str, start_timestamp: int, end_timestamp: int, fill_gaps: bool
+) -> None:
+    with SessionLocal() as session:
+        coverage = get_coverage(session, exchange, symbol, "1m")
+    if not fill_gaps and coverage:
+        coverage = [(coverage[0][0], coverage[-1][1])]
+
+    if not coverage or start_timestamp < coverage[0][0]:
+        start_timestamp = max(start_timestamp, driver.get_starting_time(symbol))
+
+    missing = plan_missing_windows(coverage, start_timestamp, end_timestamp, calendar=driver.calendar)
+    logger.info(f"{symbol}: {len(missing)} ranges to import")
+
+    for range_start, range_end in missing:
+        _import_range(driver, exchange, symbol, range_start, range_end, range_end < end_timestamp, fill_gaps)
+
+
+def _import_range(
+    driver: CandleExchange,
+    exchange: str,
+    symbol: str,
+    start_timestamp: int,
+    end_timestamp: int,
+    followed_by_coverage: bool,
+    fill_gaps: bool = True,
+) -> None:
+    """
+    Stream one missing range from the exchange page by page and store each page with the minutes around its
+    candles filled. The range is filled from its start, at the close of the candle stored before it or at the
+    open of the first candle fetched if there is none, so that the next import does not request the minutes
+    before the first trade again. It is filled up to its end only if stored candles follow it.
+    """
+    previous_close = _get_previous_close(exchange, symbol, start_timestamp)
+    fill_from = start_timestamp
+    pages = driver.fetch_range(symbol, start_timestamp, end_timestamp, "1m")
+    page = next(pages, None)
+
+    if page is None:
+        if driver.backup_exchange is not None:
+            store_candles_list(
+                _get_candles_from_backup_exchange(
+                    exchange, driver.backup_exchange, symbol, start_timestamp, end_timestamp
+                )
+            )
+        else:
+            logger.info(
+                f"{symbol}: no candles between {timestamp_to_time(start_timestamp)} "
+                f"and {timestamp_to_time(end_timestamp)}"
             )
-            .count()
+        return
+
+    while page is not None:
+        next_page = next(pages, None)
+        if not fill_gaps:
+            store_candles_list(page)
+            page = next_page
+            continue
+        fill_to = end_timestamp if next_page is None and followed_by_coverage else page[-1]["timestamp"]
+        candles = _fill_absent_candles(
+            page, fill_from, fill_to, previous_close=previous_close, calendar=driver.calendar
         )
-        already_exists = count == driver.count
-
-        if not already_exists:
-            if temp_end_timestamp > now_to_timestamp():
-                temp_end_timestamp = arrow.utcnow().floor("minute").int_timestamp * 1000 - 60_000
-
-            candles = driver.fetch(symbol, temp_start_timestamp, "1m")
-
-            time_diff = int((candles[0]["timestamp"] - temp_start_timestamp) / 1000) if len(candles) else 0
-            if not len(candles) or time_diff < 0 or time_diff > 60 * 100:
-                first_existing_timestamp = driver.get_starting_time(symbol)
-
-                if first_existing_timestamp is None:
-                    raise ValueError(f"No candles exist for the market for time {first_existing_timestamp}")
-
-                if temp_end_timestamp > first_existing_timestamp:
-                    if driver.backup_exchange is not None:
-                        candles = _get_candles_from_backup_exchange(
-                            exchange, driver.backup_exchange, symbol, temp_start_timestamp, temp_end_timestamp
-                        )
-                else:
-                    run(client_id, exchange, symbol, timestamp_to_time(first_existing_timestamp)[:10], mode)
-                    return
-
-            candles = _fill_absent_candles(candles, temp_start_timestamp, temp_end_timestamp)
-            store_candles_list(candles)
-
-        start_date = start_date.shift(minutes=driver.count)
-
-        if not already_exists:
-            time.sleep(driver.sleep_time)
+        store_candles_list(candles)
+        previous_close = candles[-1]["close"]
+        fill_from = fill_to + 60_000
+        page = next_page
+
+
+def _get_previous_close(exchange: str, symbol: str, timestamp: int) -> float | None:
+    """The close of the last stored candle before ``timestamp``."""
+    with SessionLocal() as session:
+        statement = (
+            select(Candle.close)
+            .where(market_clause(exchange, symbol, "1m"), Candle.timestamp < timestamp)
+            .order_by(Candle.timestamp.desc())
+            .limit(1)
+        )
+        return session.execute(statement).scalar()
+
+
+def run_many(
+    client_id: str,
+    exchange: str,
+    symbols: list[str],
+    start_date_str: str,
+    max_workers: int = 8,
+    fill_gaps: bool = True,
+) -> dict[str, Exception]:
+    """
+    Import several symbols concurrently, one thread per symbol up to ``max_workers``. All threads share one driver,
+    so its pooled connections are reused across symbols, and draw from one token bucket at the exchange's rate
+    limit, so while one symbol waits on the network others fill gaps and write to the database, without the
+    exchange seeing more requests than it allows. Returns the errors of the symbols that failed.
+    """
+    errors = {}
+    with drivers[exchange]() as driver, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        driver.limiter = TokenBucket(driver.rate_limit_per_second)
+        futures = {
+            pool.submit(run, client_id, exchange, symbol, start_date_str, fill_gaps=fill_gaps, driver=driver): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                future.result()
+                logger.info(f"Finished importing {symbol}")
+            except Exception as e:
+                logger.exception(f"Failed to import {symbol}")
+                errors[symbol] = e
+    return errors
 
 
 def _get_candles_from_backup_exchange(
@@ -95,24 +179,21 @@ def _get_candles_from_backup_exchange(
 ) -> list[dict[str, Union[str, Any]]]:
     timeframe = "1m"
     total_candles = []
-    session = SessionLocal()
     statement = (
         select(Candle.timestamp, Candle.open, Candle.close, Candle.high, Candle.low, Candle.volume)
         .where(
-            Candle.exchange == backup_driver.name,
-            Candle.symbol == symbol,
-            Candle.timeframe == timeframe,
+            market_clause(backup_driver.name, symbol, timeframe),
             Candle.timestamp.between(start_timestamp, end_timestamp),
         )
         .order_by(asc(Candle.timestamp))
     )
-    backup_candles = session.execute(statement)
+    with SessionLocal() as session:
+        backup_candles = session.execute(statement).all()
     already_exists = len(backup_candles) == (end_timestamp - start_timestamp) / 60_000 + 1
     if already_exists:
         for c in backup_candles:
             total_candles.append(
                 {
-                    "id": generate_unique_id(),
                     "exchange": exchange,
                     "symbol": symbol,
                     "timeframe": timeframe,
@@ -131,59 +212,102 @@ def _get_candles_from_backup_exchange(
 
 
 def _fill_absent_candles(
-    temp_candles: List[Dict[str, Union[str, Any]]], start_timestamp: int, end_timestamp: int
-) -> List[Dict[str, Union[str, Any]]]:
+    temp_candles: List[Dict[str, Union[str, Any]]],
+    start_timestamp: int,
+    end_timestamp: int,
+    as_arrays: bool = False,
+    previous_close: float | None = None,
+    calendar: MarketCalendar | None = None,
+) -> List[Dict[str, Union[str, Any]]] | Dict[str, npt.NDArray]:
+    """
+    Return one 1m candle for every minute from ``start_timestamp`` to ``end_timestamp``, taking fetched candles
+    where they exist and flat zero-volume candles at the last close for the minutes in between. Before the first
+    fetched candle the last close is ``previous_close``, or the first fetched open if that is not given. With a
+    ``calendar`` only minutes within its sessions are filled, and fetched candles outside them are kept as they
+    are. With ``as_arrays`` the result is a dict of OHLCV column arrays.
+    """
+    timestamps = _fill_timestamps(temp_candles, start_timestamp, end_timestamp, calendar)
+    if as_arrays:
+        return _fill_absent_candle_arrays(temp_candles, timestamps, previous_close)
+
     symbol = temp_candles[0]["symbol"]
     exchange = temp_candles[0]["exchange"]
+    candles_by_timestamp = {}
+    for c in temp_candles:
+        candles_by_timestamp.setdefault(c["timestamp"], c)
     candles = []
-    first_candle = temp_candles[0]
-    started = False
-    loop_length = ((end_timestamp - start_timestamp) / 60_000) + 1
+    last_close = temp_candles[0]["open"] if previous_close is None else previous_close
 
-    for _ in range(int(loop_length)):
-        candle_for_timestamp = pydash.find(temp_candles, lambda c: c["timestamp"] == start_timestamp)
+    for timestamp in timestamps.tolist():
+        candle_for_timestamp = candles_by_timestamp.get(timestamp)
 
         if candle_for_timestamp is None:
-            if started:
-                last_close = candles[-1]["close"]
-                candles.append(
-                    {
-                        "id": generate_unique_id(),
-                        "exchange": exchange,
-                        "symbol": symbol,
-                        "timeframe": "1m",
-                        "timestamp": start_timestamp,
-                        "open": last_close,
-                        "high": last_close,
-                        "low": last_close,
-                        "close": last_close,
-                        "volume": 0,
-                    }
-                )
-            else:
-                candles.append(
-                    {
-                        "id": generate_unique_id(),
-                        "exchange": exchange,
-                        "symbol": symbol,
-                        "timeframe": "1m",
-                        "timestamp": start_timestamp,
-                        "open": first_candle["open"],
-                        "high": first_candle["open"],
-                        "low": first_candle["open"],
-                        "close": first_candle["open"],
-                        "volume": 0,
-                    }
-                )
+            candles.append(
+                {
+                    "exchange": exchange,
+                    "symbol": symbol,
+                    "timeframe": "1m",
+                    "timestamp": timestamp,
+                    "open": last_close,
+                    "high": last_close,
+                    "low": last_close,
+                    "close": last_close,
+                    "volume": 0,
+                }
+            )
         else:
-            started = True
+            last_close = candle_for_timestamp["close"]
             candles.append(candle_for_timestamp)
 
-        start_timestamp += 60_000
     return candles
 
 
-def store_candles_list(candles: list[dict]) -> None:
+def _fill_timestamps(
+    temp_candles: List[Dict[str, Union[str, Any]]],
+    start_timestamp: int,
+    end_timestamp: int,
+    calendar: MarketCalendar | None = None,
+) -> npt.NDArray[np.int64]:
+    if calendar is None:
+        return np.arange(start_timestamp, end_timestamp + 1, 60_000, dtype=np.int64)
+    fetched = np.array([c["timestamp"] for c in temp_candles], dtype=np.int64)
+    fetched = fetched[(fetched >= start_timestamp) & (fetched <= end_timestamp)]
+    return np.union1d(calendar.trading_minutes(start_timestamp, end_timestamp), fetched)
+
+
+def _fill_absent_candle_arrays(
+    temp_candles: List[Dict[str, Union[str, Any]]],
+    timestamps: npt.NDArray[np.int64],
+    previous_close: float | None = None,
+) -> Dict[str, npt.NDArray]:
+    fetched = {name: np.array([c[name] for c in temp_candles], dtype=dtype) for name, dtype in CANDLE_COLUMNS.items()}
+
+    # a stable sort keeps the first of any duplicated timestamps first, which is the one searchsorted finds
+    order = np.argsort(fetched["timestamp"], kind="stable")
+    positions = np.minimum(np.searchsorted(fetched["timestamp"][order], timestamps), len(order) - 1)
+    source = order[positions]
+    found = fetched["timestamp"][source] == timestamps
+
+    last_found = np.maximum.accumulate(np.where(found, np.arange(len(timestamps)), -1))
+    initial_price = temp_candles[0]["open"] if previous_close is None else previous_close
+    fill_price = np.where(last_found >= 0, fetched["close"][source[np.maximum(last_found, 0)]], initial_price)
+
+    columns = {"timestamp": timestamps}
+    for name in ("open", "high", "low", "close"):
+        columns[name] = np.where(found, fetched[name][source], fill_price)
+    columns["volume"] = np.where(found, fetched["volume"][source], 0.0)
+    return columns
+
+
+def store_candles_list(candles: list[dict], bulk: bool = True, batch_size: int = 50_000) -> None:
+    """
+    Save candles, skipping any that already exist. With ``bulk`` the rows are streamed with ``COPY`` into a
+    temporary staging table and merged from there, falling back to ``INSERT ... ON CONFLICT DO NOTHING``
+    statements if the database driver does not support ``COPY``. Either way rows are sent ``batch_size`` at a time.
+    The exchange, symbol and timeframe of each candle are stored as ids into the dictionary tables, registering
+    markets seen for the first time, and an ``id`` in the dicts is ignored, as candles have none. The months the
+    candles fall in are dropped from the local candle cache.
+    """
     logger.info(
         f"Saving candles from {timestamp_to_time(candles[0]['timestamp'])} "
         + f"to {timestamp_to_time(candles[-1]['timestamp'])}"
@@ -193,11 +317,86 @@ def store_candles_list(candles: list[dict]) -> None:
         if "timeframe" not in c:
             raise ValueError("Candle has no timeframe")
 
-    stmt = insert(Candle).values(candles)
-    stmt = stmt.on_conflict_do_nothing(index_elements=["exchange", "symbol", "timeframe", "timestamp"])
-    db = SessionLocal()
-    db.execute(stmt)
-    db.commit()
+    timestamps = [c["timestamp"] for c in candles]
+    with engine.begin() as connection:
+        ensure_partitions(connection, min(timestamps), max(timestamps))
+
+    rows = _candle_rows(candles)
+    copied = False
+    if bulk:
+        try:
+            copied = _copy_candles(rows, batch_size)
+            if not copied:
+                logger.warning("Bulk COPY is not available, falling back to INSERT")
+        except engine.dialect.loaded_dbapi.NotSupportedError as e:
+            logger.warning(f"Bulk COPY is not supported ({e}), falling back to INSERT")
+    if not copied:
+        _insert_candles(rows, batch_size)
+
+    _invalidate_cached_candles(candles)
+
+
+def _invalidate_cached_candles(candles: list[dict]) -> None:
+    ranges = {}
+    for c in candles:
+        market = (c["exchange"], c["symbol"], c["timeframe"])
+        first, last = ranges.get(market, (c["timestamp"], c["timestamp"]))
+        ranges[market] = (min(first, c["timestamp"]), max(last, c["timestamp"]))
+    for (exchange, symbol, timeframe), (first, last) in ranges.items():
+        candle_cache.invalidate(exchange, symbol, timeframe, first, last)
+
+
+def _candle_rows(candles: list[dict]) -> list[dict]:
+    columns = [c.name for c in Candle.__table__.columns]
+    ids = {}
+    rows = []
+    for c in candles:
+        market = (c["exchange"], c["symbol"], c["timeframe"])
+        if market not in ids:
+            exchange, symbol, timeframe = market
+            ids[market] = instrument_id(exchange, symbol, create=True), timeframe_id(timeframe, create=True)
+        row = {name: c.get(name) for name in columns}
+        row["instrument_id"], row["timeframe_id"] = ids[market]
+        rows.append(row)
+    return rows
+
+
+def _insert_candles(rows: list[dict], batch_size: int) -> None:
+    with session_scope() as db:
+        for i in range(0, len(rows), batch_size):
+            stmt = insert(Candle).values(rows[i : i + batch_size])
+            stmt = stmt.on_conflict_do_nothing(index_elements=CANDLE_NATURAL_KEY)
+            db.execute(stmt)
+
+
+def _copy_candles(rows: list[dict], batch_size: int) -> bool:
+    """Merge the rows through a COPY into a staging table. Returns False without writing if the driver cannot COPY."""
+    columns = list(rows[0])
+    column_list = ", ".join(columns)
+    table = Candle.__tablename__
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if not hasattr(cursor, "copy_expert"):
+            return False
+        cursor.execute(f"CREATE TEMP TABLE {table}_staging (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+        for i in range(0, len(rows), batch_size):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows([row[name] for name in columns] for row in rows[i : i + batch_size])
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table}_staging ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute(
+                f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {table}_staging "
+                f"ON CONFLICT ({', '.join(CANDLE_NATURAL_KEY)}) DO NOTHING"
+            )
+            cursor.execute(f"TRUNCATE {table}_staging")
+        connection.commit()
+        return True
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
 
 
 if __name__ == "__main__":
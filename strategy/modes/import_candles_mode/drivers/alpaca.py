@@ -1,19 +1,23 @@
 import os
 import time
-
-import arrow
-import requests
+from typing import Iterator
 
 import strategy.helpers as sh
+from strategy.market_calendar import NYSECalendar
 from strategy.modes.import_candles_mode.drivers.base_candles_exchange import CandleExchange
 
 
 class AlpacaExchange(CandleExchange):
-    def __init__(self):
-        super().__init__(name="alpaca", count=10_000, rate_limit_per_second=2)
+    # Alpaca also returns pre- and post-market bars; minute bars outside regular hours are dropped, so what is stored
+    # does not depend on whether a range was imported in one go or session by session
+    calendar = NYSECalendar()
+
+    def __init__(self, pool_size: int = 10):
+        super().__init__(name="alpaca", count=10_000, rate_limit_per_second=2, pool_size=pool_size)
         self.base_url = "https://data.alpaca.markets/v2"
         self.api_key = os.environ["APCA_API_KEY_ID"]
         self.api_secret = os.environ["APCA_API_SECRET_KEY"]
+        self.session.headers.update(self._get_headers())
 
     def get_starting_time(self, symbol: str) -> int:
         url = f"{self.base_url}/stocks/{symbol}/bars"
@@ -22,9 +26,7 @@ class AlpacaExchange(CandleExchange):
             "limit": 1,
             "start": "1970-01-01T00:00:00Z",
         }
-        response = requests.get(url, headers=self._get_headers(), params=params)
-        self.validate_response(response)
-        data = response.json()
+        data = self.get(url, params=params).json()
         if "bars" in data and len(data["bars"]) > 0:
             return self._convert_iso_to_timestamp(data["bars"][0]["t"])
         else:
@@ -32,9 +34,7 @@ class AlpacaExchange(CandleExchange):
 
     def get_available_symbols(self) -> list:
         url = f'{self.base_url.replace("data", "api")}/assets'
-        response = requests.get(url, headers=self._get_headers())
-        self.validate_response(response)
-        data = response.json()
+        data = self.get(url).json()
         return [asset["symbol"] for asset in data if asset["tradable"]]
 
     def _get_headers(self):
@@ -44,35 +44,69 @@ class AlpacaExchange(CandleExchange):
     def fetch(self, symbol: str, start_timestamp: int, timeframe: str = "1Min") -> list:
         """Fetch candle data from Alpaca."""
         url = f"{self.base_url}/stocks/{symbol}/bars"
-
-        old_timeframe = timeframe
-        if timeframe.endswith("m"):
-            timeframe = timeframe.replace("m", "Min")
-
-        params = {"start": self._convert_timestamp_to_iso(start_timestamp), "timeframe": timeframe, "limit": self.count}
-        response = requests.get(url, headers=self._get_headers(), params=params)
-        self.validate_response(response)
-
-        data = response.json()
+        params = {
+            "start": self._convert_timestamp_to_iso(start_timestamp),
+            "timeframe": self._to_alpaca_timeframe(timeframe),
+            "limit": self.count,
+        }
+        data = self.get(url, params=params).json()
         if "bars" in data:
-            return [
-                {
-                    "id": sh.generate_unique_id(),
-                    "timestamp": sh.arrow_to_timestamp(arrow.get(c["t"])),
-                    "open": c["o"],
-                    "close": c["c"],
-                    "high": c["h"],
-                    "low": c["l"],
-                    "volume": c["v"],
-                    "exchange": self.name,
-                    "symbol": symbol,
-                    "timeframe": old_timeframe,
-                }
-                for c in data["bars"]
-            ]
+            return self._to_candles(symbol, data["bars"], timeframe)
         else:
             raise ValueError(f"Unexpected response format: {data}")
 
+    def fetch_range(
+        self, symbol: str, start_timestamp: int, end_timestamp: int, timeframe: str = "1m"
+    ) -> Iterator[list]:
+        """
+        Fetch the candles from ``start_timestamp`` to ``end_timestamp`` a page at a time, following Alpaca's
+        ``next_page_token`` so that nights, weekends and holidays cost no extra requests.
+        """
+        url = f"{self.base_url}/stocks/{symbol}/bars"
+        params = {
+            "start": self._convert_timestamp_to_iso(start_timestamp),
+            "end": self._convert_timestamp_to_iso(end_timestamp),
+            "timeframe": self._to_alpaca_timeframe(timeframe),
+            "limit": self.count,
+        }
+        while True:
+            data = self.get(url, params=params).json()
+            if "bars" not in data:
+                raise ValueError(f"Unexpected response format: {data}")
+            candles = self._to_candles(symbol, data["bars"], timeframe)
+            if candles:
+                yield candles
+            if not data.get("next_page_token"):
+                return
+            params["page_token"] = data["next_page_token"]
+
+    def _to_candles(self, symbol: str, bars: list[dict] | None, timeframe: str) -> list:
+        bars = bars or []
+        timestamps = sh.iso_to_timestamps([c["t"] for c in bars])
+        if timeframe.endswith("m") or timeframe.endswith("Min"):
+            in_session = self.calendar.in_session(timestamps)
+            bars = [c for c, keep in zip(bars, in_session) if keep]
+            timestamps = timestamps[in_session]
+        timestamps = timestamps.tolist()
+        return [
+            {
+                "timestamp": timestamp,
+                "open": c["o"],
+                "close": c["c"],
+                "high": c["h"],
+                "low": c["l"],
+                "volume": c["v"],
+                "exchange": self.name,
+                "symbol": symbol,
+                "timeframe": timeframe,
+            }
+            for c, timestamp in zip(bars, timestamps)
+        ]
+
+    @staticmethod
+    def _to_alpaca_timeframe(timeframe: str) -> str:
+        return timeframe.replace("m", "Min") if timeframe.endswith("m") else timeframe
+
     @staticmethod
     def _convert_timestamp_to_iso(timestamp: int) -> str:
         """Convert a Unix timestamp to an ISO 8601 formatted string."""
@@ -81,7 +115,7 @@ class AlpacaExchange(CandleExchange):
     @staticmethod
     def _convert_iso_to_timestamp(iso_time: str) -> int:
         """Convert an ISO 8601 formatted string to a Unix timestamp."""
-        return sh.arrow_to_timestamp(arrow.get(iso_time))
+        return int(sh.iso_to_timestamps([iso_time])[0])
 
 
 if __name__ == "__main__":
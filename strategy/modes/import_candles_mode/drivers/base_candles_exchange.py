@@ -1,13 +1,75 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import strategy.helpers as sh
+from strategy.market_calendar import AlwaysOpenCalendar, MarketCalendar
+
+# statuses retried with exponential backoff before validate_response sees them
+RETRY_STATUSES = (429, 500, 502, 503, 504)
 
 
 class CandleExchange(ABC):
-    def __init__(self, name: str, count: int, rate_limit_per_second: float):
+    # trading sessions of the exchange's markets; candle gaps are only filled within them
+    calendar: MarketCalendar = AlwaysOpenCalendar()
+
+    def __init__(
+        self,
+        name: str,
+        count: int,
+        rate_limit_per_second: float,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeout: float = 30,
+        calendar: MarketCalendar | None = None,
+    ):
         self.name = name
         self.count = count
+        self.rate_limit_per_second = rate_limit_per_second
         self.sleep_time = 1 / rate_limit_per_second
+        self.timeout = timeout
+        if calendar is not None:
+            self.calendar = calendar
+        self.session = self._create_session(pool_size, max_retries, backoff_factor)
+        # optional TokenBucket shared by everything requesting from this exchange, acquired before each request
+        self.limiter = None
+
+    @staticmethod
+    def _create_session(pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+        """A keep-alive session with a connection pool, so requests reuse TCP/TLS connections."""
+        retries = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        return session
+
+    def get(self, url: str, params: dict | None = None) -> requests.Response:
+        if self.limiter is not None:
+            self.limiter.acquire()
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        self.validate_response(response)
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "CandleExchange":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     @property
     def backup_exchange(self):
@@ -17,6 +79,26 @@ class CandleExchange(ABC):
     def fetch(self, symbol: str, start_timestamp: int, timeframe: str) -> list:
         pass
 
+    def fetch_range(
+        self, symbol: str, start_timestamp: int, end_timestamp: int, timeframe: str = "1m"
+    ) -> Iterator[list]:
+        """
+        Yield the candles from ``start_timestamp`` to ``end_timestamp`` inclusive, one non-empty page at a time.
+
+        Pages are requested with ``fetch`` from the timestamp after the last candle received. Drivers whose API can
+        bound a request by an end time and continue it with a page token should override this, so that time with
+        no candles (a closed market) costs no extra requests.
+        """
+        timeframe_ms = sh.timeframe_to_ms(timeframe)
+        while start_timestamp <= end_timestamp:
+            candles = self.fetch(symbol, start_timestamp, timeframe)
+            if not candles:
+                return
+            page = [c for c in candles if start_timestamp <= c["timestamp"] <= end_timestamp]
+            if page:
+                yield page
+            start_timestamp = candles[-1]["timestamp"] + timeframe_ms
+
     @abstractmethod
     def get_starting_time(self, symbol: str) -> int:
         pass
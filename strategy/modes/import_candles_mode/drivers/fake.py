@@ -0,0 +1,65 @@
+import math
+
+from strategy.market_calendar import MarketCalendar
+from strategy.modes.import_candles_mode.drivers.base_candles_exchange import CandleExchange
+
+
+def fake_candles(exchange: str, symbol: str, start_timestamp: int, count: int, skip_every: int = 0) -> list[dict]:
+    """
+    Deterministic 1m candles for tests, ``count`` minutes from ``start_timestamp``. With ``skip_every`` every
+    ``skip_every``-th minute (counted from the epoch) has no candle, to exercise gap filling.
+    """
+    candles = []
+    for i in range(count):
+        timestamp = start_timestamp + i * 60_000
+        minute = timestamp // 60_000
+        if skip_every and minute % skip_every == 0:
+            continue
+        price = 100 + 10 * math.sin(minute / 240)
+        candles.append(
+            {
+                "exchange": exchange,
+                "symbol": symbol,
+                "timeframe": "1m",
+                "timestamp": timestamp,
+                "open": price,
+                "close": price + 0.5,
+                "high": price + 1,
+                "low": price - 1,
+                "volume": float(minute % 100),
+            }
+        )
+    return candles
+
+
+class FakeExchange(CandleExchange):
+    """
+    Local stand-in for an exchange API, serving fake_candles and counting the requests made. Like ``get``, every
+    request first acquires the driver's limiter if it has one.
+    """
+
+    def __init__(
+        self, count: int = 1_000, skip_every: int = 0, starting_time: int = 0, calendar: MarketCalendar | None = None
+    ):
+        super().__init__(name="fake", count=count, rate_limit_per_second=1_000, calendar=calendar)
+        self.skip_every = skip_every
+        self.starting_time = starting_time
+        self.requests = 0
+
+    def _request(self):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        self.requests += 1
+
+    def fetch(self, symbol: str, start_timestamp: int, timeframe: str = "1m") -> list:
+        self._request()
+        start_timestamp = max(start_timestamp, self.starting_time)
+        return fake_candles(self.name, symbol, start_timestamp, self.count, self.skip_every)
+
+    def get_starting_time(self, symbol: str) -> int:
+        self._request()
+        return self.starting_time
+
+    def get_available_symbols(self) -> list:
+        self._request()
+        return ["FAKE"]
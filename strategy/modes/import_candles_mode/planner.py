@@ -0,0 +1,61 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from strategy.db.candle import Candle, market_clause
+from strategy.market_calendar import MarketCalendar
+
+
+def get_coverage(
+    session: Session, exchange: str, symbol: str, timeframe: str = "1m", timeframe_ms: int = 60_000
+) -> list[tuple[int, int]]:
+    """
+    The stored candles of a market as a sorted list of ``(first, last)`` timestamps of gap-free runs, computed by
+    the database in a single query: within a run, ``timestamp - rank * timeframe_ms`` is constant.
+    """
+    rank = func.dense_rank().over(order_by=Candle.timestamp)
+    candles = (
+        select(Candle.timestamp, (Candle.timestamp - rank * timeframe_ms).label("run"))
+        .where(market_clause(exchange, symbol, timeframe))
+        .subquery()
+    )
+    first = func.min(candles.c.timestamp)
+    statement = select(first, func.max(candles.c.timestamp)).group_by(candles.c.run).order_by(first)
+    return [(first, last) for first, last in session.execute(statement)]
+
+
+def plan_missing_windows(
+    coverage: list[tuple[int, int]],
+    start_timestamp: int,
+    end_timestamp: int,
+    timeframe_ms: int = 60_000,
+    calendar: MarketCalendar | None = None,
+) -> list[tuple[int, int]]:
+    """
+    The ``(first, last)`` timestamps, both inclusive, of every range between ``start_timestamp`` and
+    ``end_timestamp`` not covered by ``coverage``.
+
+    With a ``calendar`` each range is trimmed to start and end within a trading session and dropped if it holds
+    none, so closed hours between stored sessions are not requested again. Ranges are not split at closed hours,
+    to keep them a single paged request.
+    """
+    missing = []
+    cursor = start_timestamp
+    for first, last in sorted(coverage):
+        if last < cursor:
+            continue
+        if first > end_timestamp:
+            break
+        if first > cursor:
+            missing.append((cursor, first - timeframe_ms))
+        cursor = last + timeframe_ms
+    if cursor <= end_timestamp:
+        missing.append((cursor, end_timestamp))
+
+    if calendar is not None:
+        trimmed = []
+        for first, last in missing:
+            sessions = calendar.sessions(first, last)
+            if sessions:
+                trimmed.append((max(first, sessions[0][0]), min(last, sessions[-1][1] - timeframe_ms)))
+        missing = trimmed
+    return missing
@@ -0,0 +1,40 @@
+from sqlalchemy import func, select
+
+from strategy.db.base import SessionLocal
+from strategy.db.candle import Candle, market_clause
+from strategy.modes.import_candles_mode import drivers, store_candles_list
+from strategy.store.candles import COLUMNS
+from strategy.store.loader import load_candles
+from strategy.store.resample import resample
+
+
+def run(exchange: str, symbol: str, timeframe: str) -> int:
+    """
+    Store ``timeframe`` candles of a market aggregated from its stored 1m candles, continuing from the last stored
+    ``timeframe`` candle. Bars are aligned to the sessions of the exchange's calendar and only complete bars are
+    stored. Returns the number of bars aggregated.
+    """
+    symbol = symbol.upper()
+    with SessionLocal() as session:
+        last_bar = session.execute(
+            select(func.max(Candle.timestamp)).where(market_clause(exchange, symbol, timeframe))
+        ).scalar()
+
+    candles = load_candles(exchange, symbol, "1m", start_timestamp=last_bar)
+    bars = resample(candles, timeframe, drivers[exchange].calendar, complete_only=True)
+    if not len(bars):
+        return 0
+
+    columns = [getattr(bars, name).tolist() for name in COLUMNS]
+    store_candles_list(
+        [
+            {
+                "exchange": exchange,
+                "symbol": symbol,
+                "timeframe": timeframe,
+                **dict(zip(COLUMNS, row)),
+            }
+            for row in zip(*columns)
+        ]
+    )
+    return len(bars)
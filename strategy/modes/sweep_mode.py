@@ -0,0 +1,114 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable
+
+import pandas as pd
+
+from strategy.db.candle import Candle
+from strategy.metrics import max_drawdown, sharpe_ratio
+from strategy.modes.backtest_mode import Backtester
+from strategy.modes.vectorized_backtest_mode import VectorizedBacktester
+from strategy.store.candle_file import column_views
+from strategy.store.candles import COLUMNS, CandleStore, to_candle_store
+from strategy.strategy import Strategy, VectorizedStrategy
+
+StrategyFactory = Callable[..., Strategy | VectorizedStrategy]
+
+# Candles attached from shared memory in a worker process, set by _attach_shared_candles.
+_worker_candles: CandleStore | None = None
+_worker_memory: SharedMemory | None = None
+
+
+def sweep(
+    strategy_factory: StrategyFactory,
+    param_grid: dict[str, list],
+    candles: list[Candle] | CandleStore,
+    initial_balance: float = 100_000,
+    processes: int | None = None,
+    periods_per_year: int = 252,
+) -> pd.DataFrame:
+    """
+    Backtest ``strategy_factory(**params)`` for every combination in ``param_grid`` and return one row per
+    combination with the parameters, pnl, trade count, max drawdown and Sharpe ratio.
+
+    The candles are copied once into shared memory which every worker process maps, so tasks only carry the
+    factory and the parameters. The factory must be picklable (a module-level function or class) unless
+    ``processes=1``, which runs everything in the current process.
+    """
+    params = grid(param_grid)
+    tasks = [(strategy_factory, p, initial_balance, periods_per_year) for p in params]
+    rows = map_over_candles(_run_backtest, tasks, to_candle_store(candles), processes)
+    return pd.DataFrame([{**p, **row} for p, row in zip(params, rows)])
+
+
+def map_over_candles(func: Callable, tasks: list[tuple], candles: CandleStore, processes: int | None = None) -> list:
+    """
+    Return ``[func(candles, *task) for task in tasks]``, computed on a process pool whose workers share one copy of
+    ``candles``. ``func`` must be a module-level function.
+    """
+    if processes == 1:
+        return [func(candles, *task) for task in tasks]
+    with SharedCandles(candles) as shared:
+        with ProcessPoolExecutor(
+            max_workers=processes, initializer=_attach_shared_candles, initargs=(shared.name, len(candles))
+        ) as pool:
+            return list(pool.map(_call_with_shared_candles, [(func, task) for task in tasks]))
+
+
+def grid(param_grid: dict[str, list]) -> list[dict[str, Any]]:
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+
+
+def summarise(backtester: Backtester | VectorizedBacktester, periods_per_year: int = 252) -> dict[str, float]:
+    return {
+        "pnl": backtester.pnl,
+        "trades": len(backtester.trades),
+        "max_drawdown": max_drawdown(backtester.equity_curve),
+        "sharpe": sharpe_ratio(backtester.daily_returns, periods_per_year),
+    }
+
+
+def _run_backtest(
+    candles: CandleStore,
+    strategy_factory: StrategyFactory,
+    params: dict[str, Any],
+    initial_balance: float,
+    periods_per_year: int,
+) -> dict[str, float]:
+    strategy = strategy_factory(**params)
+    if isinstance(strategy, VectorizedStrategy):
+        backtester = VectorizedBacktester(strategy=strategy, initial_balance=initial_balance)
+    else:
+        backtester = Backtester(strategy=strategy, initial_balance=initial_balance)
+    backtester.backtest(candles)
+    return summarise(backtester, periods_per_year)
+
+
+def _call_with_shared_candles(job: tuple[Callable, tuple]) -> Any:
+    func, task = job
+    return func(_worker_candles, *task)
+
+
+class SharedCandles:
+    """Copies the columns of a CandleStore into one named shared memory block, unlinked on exit."""
+
+    def __init__(self, candles: CandleStore):
+        self.memory = SharedMemory(create=True, size=max(len(COLUMNS) * len(candles) * 8, 1))
+        self.name = self.memory.name
+        for name, column in column_views(self.memory.buf, len(candles)).items():
+            column[:] = getattr(candles, name)
+
+    def __enter__(self) -> "SharedCandles":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.memory.close()
+        self.memory.unlink()
+
+
+def _attach_shared_candles(name: str, length: int):
+    global _worker_candles, _worker_memory
+    _worker_memory = SharedMemory(name=name)
+    _worker_candles = CandleStore.from_arrays(copy=False, **column_views(_worker_memory.buf, length))
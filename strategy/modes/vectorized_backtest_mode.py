@@ -0,0 +1,138 @@
+import numpy as np
+import numpy.typing as npt
+
+import strategy.helpers as sh
+from strategy.db.candle import Candle
+from strategy.modes.backtest_mode import Trade
+from strategy.store.candles import CandleStore, to_candle_store
+from strategy.strategy import Signals, VectorizedStrategy
+
+
+class VectorizedBacktester:
+    """
+    Backtests a VectorizedStrategy from signal arrays over the whole history.
+
+    Trades follow the same rules as the event-driven Backtester: an entry is only taken when flat, the position is
+    checked for stop loss, take profit and exit signals on the entry bar and every bar after it, and anything still
+    open is closed on the last candle. Only the entry and exit bars are visited in Python; the search for the next
+    entry/exit and the balance, marked-to-market equity curve and returns are array operations, so ``trades`` and
+    ``equity_curve`` match what the Backtester produces for an equivalent strategy.
+    """
+
+    def __init__(self, strategy: VectorizedStrategy, initial_balance: float = 100_000):
+        self.strategy = strategy
+        self.initial_balance = initial_balance
+        self.balance = initial_balance
+        self.pnl = 0
+        self.trades: list[Trade] = []
+        self.daily_returns = np.empty(0)
+        self.equity_curve = np.array([initial_balance], dtype=np.float64)
+        self.candles: CandleStore | None = None
+
+    def backtest(self, candles: list[Candle] | CandleStore, signals: Signals | None = None):
+        self.candles = to_candle_store(candles)
+        n = len(self.candles)
+        if signals is None:
+            signals = self.strategy.generate_signals(self.candles)
+
+        long_entries = _mask(signals.long_entries, n)
+        short_entries = _mask(signals.short_entries, n)
+        price = self.candles.close if signals.price is None else _levels(signals.price, n)
+        quantity = _levels(signals.quantity, n)
+        stop_loss = _levels(signals.stop_loss, n)
+        take_profit = _levels(signals.take_profit, n)
+        next_entry = _next_true(long_entries | short_entries)
+        next_exit = _next_true(_mask(signals.exits, n))
+
+        # Balance changes are kept as (entry, exit) pairs per bar so the running sum is accumulated in the same
+        # order as the event loop, which applies the entry before checking for an exit on the same bar.
+        deltas = np.zeros((n, 2), dtype=np.float64)
+        # Signed quantity held at the close of each bar, to mark open positions to market.
+        position = np.zeros(n, dtype=np.float64)
+        self.trades = []
+        self.pnl = 0
+        i = 0
+        while i < n and next_entry[i] < n:
+            entry = next_entry[i]
+            side = "long" if long_entries[entry] else "short"
+            entry_price = float(price[entry])
+            qty = float(quantity[entry])
+            exit_ = min(
+                next_exit[entry],
+                self._first_stop(side, entry, float(stop_loss[entry]), float(take_profit[entry])),
+                n - 1,
+            )
+            exit_price = float(self.candles.close[exit_])
+            if side == "long":
+                deltas[entry, 0] -= entry_price * qty
+                deltas[exit_, 1] += exit_price * qty
+                position[entry:exit_] = qty
+                trade_pnl = (exit_price - entry_price) * qty
+            else:
+                deltas[entry, 0] += entry_price * qty
+                deltas[exit_, 1] -= exit_price * qty
+                position[entry:exit_] = -qty
+                trade_pnl = (entry_price - exit_price) * qty
+            self.pnl += trade_pnl
+            self.trades.append(
+                Trade(
+                    type=side,
+                    entry_price=entry_price,
+                    exit_price=exit_price,
+                    pnl=trade_pnl,
+                    timestamp=sh.timestamp_to_datetime(int(self.candles.timestamp[exit_])),
+                )
+            )
+            i = exit_ + 1
+
+        balances = np.cumsum(np.concatenate(([self.initial_balance], deltas.ravel())))[2::2]
+        self.equity_curve = np.concatenate(([self.initial_balance], balances + position * self.candles.close))
+        self.daily_returns = np.diff(self.equity_curve) / self.equity_curve[:-1]
+        self.balance = float(balances[-1]) if n else self.initial_balance
+
+    def _first_stop(self, side: str, start: int, stop_loss: float, take_profit: float) -> int:
+        # Galloping search so the work done is proportional to how long the trade stays open.
+        has_stop_loss = bool(stop_loss) and not np.isnan(stop_loss)
+        has_take_profit = bool(take_profit) and not np.isnan(take_profit)
+        n = len(self.candles)
+        if not has_stop_loss and not has_take_profit:
+            return n
+        low, high = self.candles.low, self.candles.high
+        size = 64
+        while start < n:
+            end = min(n, start + size)
+            hit = np.zeros(end - start, dtype=np.bool_)
+            if has_stop_loss:
+                hit |= high[start:end] >= stop_loss if side == "short" else low[start:end] <= stop_loss
+            if has_take_profit:
+                hit |= low[start:end] <= take_profit if side == "short" else high[start:end] >= take_profit
+            if hit.any():
+                return start + int(np.argmax(hit))
+            start = end
+            size *= 2
+        return n
+
+
+def _mask(values: npt.ArrayLike | None, n: int) -> npt.NDArray[np.bool_]:
+    if values is None:
+        return np.zeros(n, dtype=np.bool_)
+    values = np.asarray(values, dtype=np.bool_)
+    if values.shape != (n,):
+        raise ValueError(f"Signal has shape {values.shape}, expected ({n},)")
+    return values
+
+
+def _levels(values: float | npt.ArrayLike | None, n: int) -> npt.NDArray[np.float64]:
+    if values is None:
+        return np.full(n, np.nan)
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim and values.shape != (n,):
+        raise ValueError(f"Signal has shape {values.shape}, expected ({n},)")
+    return np.broadcast_to(values, (n,))
+
+
+def _next_true(mask: npt.NDArray[np.bool_]) -> npt.NDArray[np.int64]:
+    """For every bar, the index of the first True at or after it, or ``len(mask)`` if there is none."""
+    n = len(mask)
+    indices = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(indices[::-1])[::-1]
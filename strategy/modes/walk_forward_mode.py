@@ -0,0 +1,102 @@
+from typing import Any
+
+import pandas as pd
+
+from strategy.db.candle import Candle
+from strategy.modes.backtest_mode import Backtester
+from strategy.modes.sweep_mode import StrategyFactory, grid, map_over_candles, summarise
+from strategy.modes.vectorized_backtest_mode import VectorizedBacktester
+from strategy.store.candles import CandleStore, to_candle_store
+from strategy.strategy import VectorizedStrategy
+
+METRICS = {"pnl": max, "sharpe": max, "max_drawdown": min}
+
+
+def walk_forward_windows(
+    length: int, in_sample_size: int, out_of_sample_size: int, step: int | None = None
+) -> list[tuple[slice, slice]]:
+    """Rolling (in-sample, out-of-sample) candle ranges; by default each window moves on by the out-of-sample size."""
+    if in_sample_size < 1 or out_of_sample_size < 1:
+        raise ValueError("in_sample_size and out_of_sample_size must be at least 1")
+    step = step or out_of_sample_size
+    windows = []
+    start = 0
+    while start + in_sample_size + out_of_sample_size <= length:
+        split = start + in_sample_size
+        windows.append((slice(start, split), slice(split, split + out_of_sample_size)))
+        start += step
+    return windows
+
+
+def walk_forward(
+    strategy_factory: StrategyFactory,
+    param_grid: dict[str, list],
+    candles: list[Candle] | CandleStore,
+    in_sample_size: int,
+    out_of_sample_size: int,
+    step: int | None = None,
+    metric: str = "sharpe",
+    initial_balance: float = 100_000,
+    processes: int | None = None,
+    periods_per_year: int = 252,
+) -> pd.DataFrame:
+    """
+    Walk-forward optimization: for every window pick the parameters with the best in-sample ``metric`` and report
+    how they did on the out-of-sample candles that follow, one row per window.
+
+    Each parameter set is one task on the sweep's process pool, which evaluates it on every window. For a
+    VectorizedStrategy the signals, and so the indicators behind them, are generated once over the full history and
+    sliced per window rather than recomputed for each overlapping window, which also means every window starts with
+    indicators already warmed up on the candles before it. Event-driven strategies are backtested per window.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {list(METRICS)}")
+    candles = to_candle_store(candles)
+    windows = walk_forward_windows(len(candles), in_sample_size, out_of_sample_size, step)
+    if not windows:
+        raise ValueError("Not enough candles for a single in-sample and out-of-sample window")
+
+    params = grid(param_grid)
+    tasks = [(strategy_factory, p, windows, initial_balance, periods_per_year) for p in params]
+    results = map_over_candles(_evaluate_windows, tasks, candles, processes)
+
+    rows = []
+    for i, (in_sample, out_of_sample) in enumerate(windows):
+        best = METRICS[metric](range(len(params)), key=lambda p: results[p][i][0][metric])
+        in_sample_summary, out_of_sample_summary = results[best][i]
+        rows.append(
+            {
+                "window": i,
+                "in_sample_start": int(candles.timestamp[in_sample.start]),
+                "in_sample_end": int(candles.timestamp[in_sample.stop - 1]),
+                "out_of_sample_start": int(candles.timestamp[out_of_sample.start]),
+                "out_of_sample_end": int(candles.timestamp[out_of_sample.stop - 1]),
+                **params[best],
+                f"in_sample_{metric}": in_sample_summary[metric],
+                **out_of_sample_summary,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def _evaluate_windows(
+    candles: CandleStore,
+    strategy_factory: StrategyFactory,
+    params: dict[str, Any],
+    windows: list[tuple[slice, slice]],
+    initial_balance: float,
+    periods_per_year: int,
+) -> list[tuple[dict[str, float], dict[str, float]]]:
+    strategy = strategy_factory(**params)
+    signals = strategy.generate_signals(candles) if isinstance(strategy, VectorizedStrategy) else None
+
+    def run(window: slice) -> dict[str, float]:
+        if signals is not None:
+            backtester = VectorizedBacktester(strategy=strategy, initial_balance=initial_balance)
+            backtester.backtest(candles[window], signals=signals[window])
+        else:
+            backtester = Backtester(strategy=strategy_factory(**params), initial_balance=initial_balance)
+            backtester.backtest(candles[window])
+        return summarise(backtester, periods_per_year)
+
+    return [(run(in_sample), run(out_of_sample)) for in_sample, out_of_sample in windows]
@@ -0,0 +1,67 @@
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from strategy.store.candles import COLUMNS
+
+CACHE_DIR = Path(os.environ.get("STRATEGY_CANDLE_CACHE", Path.home() / ".cache" / "strategy" / "candles"))
+
+
+class CandleCache:
+    """
+    Local Parquet copy of stored candles with one file per exchange, symbol, timeframe and UTC calendar month, e.g.
+    ``alpaca/AAPL/1m/2024-01.parquet``. Files are replaced atomically, so concurrent readers see either the old or
+    the new month.
+    """
+
+    def __init__(self, root: Path | str = CACHE_DIR):
+        self.root = Path(root)
+
+    def path(self, exchange: str, symbol: str, timeframe: str, month: int) -> Path:
+        label = datetime.fromtimestamp(month / 1000, tz=timezone.utc).strftime("%Y-%m")
+        return self.root / exchange / symbol / timeframe / f"{label}.parquet"
+
+    def read(self, exchange: str, symbol: str, timeframe: str, month: int) -> dict[str, npt.NDArray] | None:
+        """The candles of the month starting at ``month``, or None if it is not cached."""
+        import pyarrow.parquet as pq
+
+        path = self.path(exchange, symbol, timeframe, month)
+        if not path.exists():
+            return None
+        table = pq.read_table(path, columns=list(COLUMNS))
+        return {name: table.column(name).to_numpy().astype(dtype, copy=False) for name, dtype in COLUMNS.items()}
+
+    def write(self, exchange: str, symbol: str, timeframe: str, month: int, columns: dict[str, npt.NDArray]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = self.path(exchange, symbol, timeframe, month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        pq.write_table(
+            pa.table({name: np.asarray(columns[name], dtype=dtype) for name, dtype in COLUMNS.items()}), partial
+        )
+        partial.replace(path)
+
+    def invalidate(self, exchange: str, symbol: str, timeframe: str, start_timestamp: int, end_timestamp: int):
+        """Drop the cached months overlapping ``start_timestamp`` to ``end_timestamp``."""
+        for month, _ in month_ranges(start_timestamp, end_timestamp):
+            self.path(exchange, symbol, timeframe, month).unlink(missing_ok=True)
+
+
+def month_ranges(start_timestamp: int, end_timestamp: int) -> list[tuple[int, int]]:
+    """The ``(first, last)`` millisecond of every UTC calendar month overlapping the given range."""
+    day = datetime.fromtimestamp(start_timestamp / 1000, tz=timezone.utc)
+    month = datetime(day.year, day.month, 1, tzinfo=timezone.utc)
+    ranges = []
+    while int(month.timestamp()) * 1000 <= end_timestamp:
+        following = datetime(month.year + month.month // 12, month.month % 12 + 1, 1, tzinfo=timezone.utc)
+        ranges.append((int(month.timestamp()) * 1000, int(following.timestamp()) * 1000 - 1))
+        month = following
+    return ranges
+
+
+candle_cache = CandleCache()
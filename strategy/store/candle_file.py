@@ -0,0 +1,53 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from strategy.store.candles import COLUMNS, CandleStore
+
+MAGIC = b"CANDLES1"
+# the magic followed by the number of candles as an int64
+HEADER_SIZE = 16
+
+
+def save_candles(path: Path | str, candles: CandleStore):
+    """
+    Write candles to a file that ``open_candles`` can memory-map: a 16 byte header followed by each column in full,
+    in the order of COLUMNS, as little-endian 8 byte values. The file is written under a temporary name of this
+    process and then renamed, so concurrent writers do not interleave and processes that already mapped the previous
+    version keep reading it.
+    """
+    path = Path(path)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with partial.open("wb") as f:
+        f.write(MAGIC)
+        f.write(np.array([len(candles)], dtype="<i8").tobytes())
+        for name, dtype in COLUMNS.items():
+            np.ascontiguousarray(getattr(candles, name), dtype=np.dtype(dtype).newbyteorder("<")).tofile(f)
+    partial.replace(path)
+
+
+def open_candles(path: Path | str) -> CandleStore:
+    """
+    Memory-map a file written by ``save_candles`` as a read-only CandleStore. The columns are views of the mapping,
+    so every process opening the same file shares one copy of it in the page cache and only the pages a backtest
+    touches are read from disk. Appending to the store moves it onto private buffers first.
+    """
+    memory = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(memory) < HEADER_SIZE or bytes(memory[:8]) != MAGIC:
+        raise ValueError(f"{path} is not a candle file")
+    length = int(memory[8:HEADER_SIZE].view("<i8")[0])
+    if len(memory) != HEADER_SIZE + len(COLUMNS) * length * 8:
+        raise ValueError(f"{path} should hold {length} candles but has {len(memory)} bytes")
+    return CandleStore.from_arrays(copy=False, **column_views(memory, length, HEADER_SIZE))
+
+
+def column_views(buffer, length: int, offset: int = 0) -> dict[str, npt.NDArray]:
+    """Arrays over ``length`` candles laid out column after column in ``buffer``, starting at ``offset``."""
+    return {
+        name: np.ndarray(
+            (length,), dtype=np.dtype(dtype).newbyteorder("<"), buffer=buffer, offset=offset + i * length * 8
+        )
+        for i, (name, dtype) in enumerate(COLUMNS.items())
+    }
@@ -1,13 +1,192 @@
+from typing import Iterator, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
 from strategy.db.candle import Candle
+from strategy.store.memoize import IndicatorMemo
+
+COLUMNS = {
+    "timestamp": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+}
+
+
+class CandleRow(NamedTuple):
+    """One candle read from a CandleStore, with the attributes of a Candle but none of the ORM overhead."""
+
+    timestamp: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
 
 
 class CandleStore:
-    def __init__(self):
-        self.candles: list[Candle] = []
+    """
+    Columnar candle storage in one growable NumPy array per field; the column properties return views, which an
+    append may leave stale. With ``max_lookback`` only the most recent candles are kept.
+    """
+
+    def __init__(self, capacity: int = 1024, max_lookback: int | None = None):
+        if max_lookback is not None:
+            if max_lookback < 1:
+                raise ValueError("max_lookback must be at least 1")
+            capacity = 2 * max_lookback
+        self.max_lookback = max_lookback
+        self._start = 0
+        self._end = 0
+        self._columns = {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in COLUMNS.items()}
+        self.version = 0
+        self.indicator_memo = IndicatorMemo()
+
+    @classmethod
+    def from_candles(cls, candles: list[Candle]) -> "CandleStore":
+        store = cls(capacity=len(candles))
+        for name, dtype in COLUMNS.items():
+            store._columns[name][: len(candles)] = np.array([getattr(c, name) for c in candles], dtype=dtype)
+        store._end = len(candles)
+        store.version += 1
+        return store
+
+    @classmethod
+    def from_arrays(cls, copy: bool = True, **columns: npt.ArrayLike) -> "CandleStore":
+        """
+        Build a store from one array per column. With ``copy=False`` the arrays are used as the store's buffers
+        as they are, e.g. to wrap shared memory; appending to such a store moves it onto newly allocated buffers.
+        """
+        store = cls(capacity=_column_length(columns))
+        for name, dtype in COLUMNS.items():
+            values = columns[name]
+            store._columns[name] = np.array(values, dtype=dtype) if copy else np.asarray(values, dtype=dtype)
+        store._end = len(store._columns["timestamp"])
+        store.version += 1
+        return store
+
+    def to_candles(self) -> list[Candle]:
+        columns = [self._view(name).tolist() for name in COLUMNS]
+        return [Candle(**dict(zip(COLUMNS, row))) for row in zip(*columns)]
+
+    def rows(self, chunk_size: int = 65_536) -> Iterator[CandleRow]:
+        """Iterate over the candles as CandleRows, converting the columns to Python values a chunk at a time."""
+        for start in range(0, len(self), chunk_size):
+            columns = [self._view(name)[start : start + chunk_size].tolist() for name in COLUMNS]
+            yield from map(CandleRow._make, zip(*columns))
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, item: slice) -> "CandleStore":
+        """A new store over a range of this one's candles, sharing its buffers."""
+        if not isinstance(item, slice):
+            raise TypeError("CandleStore can only be indexed with a slice")
+        return CandleStore.from_arrays(copy=False, **{name: self._view(name)[item] for name in COLUMNS})
+
+    def add_candle(self, candle: Candle | CandleRow):
+        if self._end == len(self._columns["timestamp"]):
+            if self.max_lookback is None:
+                self._grow()
+            else:
+                self._compact()
+        for name, column in self._columns.items():
+            column[self._end] = getattr(candle, name)
+        self._end += 1
+        self.version += 1
+        if self.max_lookback is not None and len(self) > self.max_lookback:
+            self._start += 1
+
+    def extend(self, **columns: npt.ArrayLike):
+        """Append many candles at once, given as one array per column."""
+        length = _column_length(columns)
+        if self.max_lookback is not None and length > self.max_lookback:
+            columns = {name: np.asarray(values)[-self.max_lookback :] for name, values in columns.items()}
+            length = self.max_lookback
+            self._start = self._end
+        if self._end + length > len(self._columns["timestamp"]):
+            if self.max_lookback is None:
+                self._grow(len(self) + length)
+            else:
+                self._compact()
+        for name, column in self._columns.items():
+            column[self._end : self._end + length] = columns[name]
+        self._end += length
+        self.version += 1
+        if self.max_lookback is not None and len(self) > self.max_lookback:
+            self._start = self._end - self.max_lookback
+
+    def _grow(self, minimum: int = 1):
+        capacity = max(2 * len(self._columns["timestamp"]), minimum)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[: len(self)] = column[self._start : self._end]
+            self._columns[name] = grown
+        self._end -= self._start
+        self._start = 0
+
+    def _compact(self):
+        length = len(self)
+        for column in self._columns.values():
+            column[:length] = column[self._start : self._end]
+        self._start = 0
+        self._end = length
 
-    def add_candle(self, candle: Candle):
-        self.candles.append(candle)
+    def _view(self, name: str) -> npt.NDArray:
+        return self._columns[name][self._start : self._end]
 
     @property
-    def most_recent_candle(self) -> Candle:
-        return self.candles[-1]
+    def timestamp(self) -> npt.NDArray[np.int64]:
+        return self._view("timestamp")
+
+    @property
+    def open(self) -> npt.NDArray[np.float64]:
+        return self._view("open")
+
+    @property
+    def high(self) -> npt.NDArray[np.float64]:
+        return self._view("high")
+
+    @property
+    def low(self) -> npt.NDArray[np.float64]:
+        return self._view("low")
+
+    @property
+    def close(self) -> npt.NDArray[np.float64]:
+        return self._view("close")
+
+    @property
+    def volume(self) -> npt.NDArray[np.float64]:
+        return self._view("volume")
+
+    @property
+    def most_recent_candle(self) -> CandleRow:
+        if not len(self):
+            raise IndexError("CandleStore is empty")
+        i = self._end - 1
+        return CandleRow(
+            timestamp=int(self._columns["timestamp"][i]),
+            open=float(self._columns["open"][i]),
+            high=float(self._columns["high"][i]),
+            low=float(self._columns["low"][i]),
+            close=float(self._columns["close"][i]),
+            volume=float(self._columns["volume"][i]),
+        )
+
+
+def _column_length(columns: dict[str, npt.ArrayLike]) -> int:
+    if set(columns) != set(COLUMNS):
+        raise ValueError(f"Expected columns {list(COLUMNS)}, got {list(columns)}")
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError("All columns must have the same length")
+    return lengths.pop()
+
+
+def to_candle_store(candles: list[Candle] | CandleStore) -> CandleStore:
+    if isinstance(candles, CandleStore):
+        return candles
+    return CandleStore.from_candles(candles)
@@ -0,0 +1,89 @@
+from typing import Iterator
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy import func, select
+
+from strategy.db.base import SessionLocal
+from strategy.db.candle import Candle, market_clause
+from strategy.helpers import now_to_timestamp
+from strategy.store.cache import CandleCache, candle_cache, month_ranges
+from strategy.store.candles import COLUMNS, CandleStore
+
+ROW_DTYPE = np.dtype(list(COLUMNS.items()))
+
+
+def stream_candles(
+    exchange: str,
+    symbol: str,
+    timeframe: str = "1m",
+    start_timestamp: int | None = None,
+    end_timestamp: int | None = None,
+    chunk_size: int = 100_000,
+) -> Iterator[dict[str, npt.NDArray]]:
+    """Yield the candles of a market in timestamp order as dicts of column arrays of up to ``chunk_size`` rows."""
+    statement = select(*(getattr(Candle, name) for name in COLUMNS)).where(market_clause(exchange, symbol, timeframe))
+    if start_timestamp is not None:
+        statement = statement.where(Candle.timestamp >= start_timestamp)
+    if end_timestamp is not None:
+        statement = statement.where(Candle.timestamp <= end_timestamp)
+    statement = statement.order_by(Candle.timestamp).execution_options(yield_per=chunk_size)
+
+    with SessionLocal() as session:
+        for rows in session.execute(statement).partitions():
+            chunk = np.fromiter(map(tuple, rows), dtype=ROW_DTYPE, count=len(rows))
+            yield {name: chunk[name] for name in COLUMNS}
+
+
+def load_candles(
+    exchange: str,
+    symbol: str,
+    timeframe: str = "1m",
+    start_timestamp: int | None = None,
+    end_timestamp: int | None = None,
+    chunk_size: int = 100_000,
+    cache: CandleCache | None = candle_cache,
+) -> CandleStore:
+    """Load the candles of a market into a CandleStore, reading months that have ended through ``cache``."""
+    store = CandleStore(capacity=chunk_size)
+    if cache is None:
+        for chunk in stream_candles(exchange, symbol, timeframe, start_timestamp, end_timestamp, chunk_size):
+            store.extend(**chunk)
+        return store
+
+    if start_timestamp is None or end_timestamp is None:
+        first, last = _timestamp_bounds(exchange, symbol, timeframe)
+        if first is None:
+            return store
+        start_timestamp = first if start_timestamp is None else start_timestamp
+        end_timestamp = last if end_timestamp is None else end_timestamp
+
+    current_month = month_ranges(now_to_timestamp(), now_to_timestamp())[0][0]
+    for month, month_end in month_ranges(start_timestamp, end_timestamp):
+        if month >= current_month:
+            for chunk in stream_candles(
+                exchange, symbol, timeframe, max(start_timestamp, month), end_timestamp, chunk_size
+            ):
+                store.extend(**chunk)
+            break
+
+        columns = cache.read(exchange, symbol, timeframe, month)
+        if columns is None:
+            chunks = list(stream_candles(exchange, symbol, timeframe, month, month_end, chunk_size))
+            columns = {
+                name: np.concatenate([chunk[name] for chunk in chunks]) if chunks else np.empty(0, dtype=dtype)
+                for name, dtype in COLUMNS.items()
+            }
+            cache.write(exchange, symbol, timeframe, month, columns)
+
+        start, end = np.searchsorted(columns["timestamp"], [start_timestamp, end_timestamp + 1])
+        store.extend(**{name: values[start:end] for name, values in columns.items()})
+    return store
+
+
+def _timestamp_bounds(exchange: str, symbol: str, timeframe: str) -> tuple[int | None, int | None]:
+    with SessionLocal() as session:
+        statement = select(func.min(Candle.timestamp), func.max(Candle.timestamp)).where(
+            market_clause(exchange, symbol, timeframe)
+        )
+        return session.execute(statement).one()
@@ -0,0 +1,56 @@
+import functools
+import inspect
+from typing import Any, Callable, Hashable
+
+
+class IndicatorMemo:
+    """
+    Memoizes indicator results for a single version of a CandleStore. The store bumps its version on every
+    ``add_candle``, which drops all results computed for the previous bar on the next lookup.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._version: int | None = None
+        self._results: dict[Hashable, Any] = {}
+
+    def get(self, key: Hashable, version: int, compute: Callable[[], Any]) -> Any:
+        if version != self._version:
+            self._results.clear()
+            self._version = version
+        if key in self._results:
+            self.hits += 1
+            return self._results[key]
+        self.misses += 1
+        result = self._results[key] = compute()
+        return result
+
+    def clear(self) -> None:
+        self._results.clear()
+        self._version = None
+
+
+def memoized(func: Callable) -> Callable:
+    """
+    Memoize an indicator's result on the CandleStore it is computed from, keyed by the indicator, its bound
+    arguments and the store version, so calling it several times within the same bar only computes it once. Plain
+    candle lists and unhashable arguments are computed without memoizing.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(candles, *args, **kwargs):
+        memo = getattr(candles, "indicator_memo", None)
+        if memo is None:
+            return func(candles, *args, **kwargs)
+        bound = signature.bind(candles, *args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__module__, func.__qualname__, tuple(bound.arguments.items())[1:])
+        try:
+            hash(key)
+        except TypeError:
+            return func(candles, *args, **kwargs)
+        return memo.get(key, candles.version, lambda: func(candles, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,159 @@
+import numpy as np
+import numpy.typing as npt
+
+from strategy.db.candle import Candle
+from strategy.helpers import timeframe_to_ms
+from strategy.market_calendar import MarketCalendar
+from strategy.store.candles import COLUMNS, CandleRow, CandleStore, to_candle_store
+
+
+def resample(
+    candles: list[Candle] | CandleStore,
+    timeframe: str,
+    calendar: MarketCalendar | None = None,
+    complete_only: bool = False,
+    base_timeframe: str = "1m",
+) -> CandleStore:
+    """
+    Aggregate ``base_timeframe`` candles into ``timeframe`` bars with the first open, highest high, lowest low, last
+    close and total volume of the candles in each, stamped with the bar's start.
+
+    Without a calendar bars are aligned to the epoch, so "1D" bars are UTC days. With one, intraday bars are aligned
+    to the open of each session and the last bar of a session ends at its close, "1D" is one bar per session and
+    candles outside the sessions are left out. With ``complete_only`` the last bar is dropped unless the candles
+    reach its end, e.g. when materializing bars that must not change later.
+    """
+    candles = to_candle_store(candles)
+    starts, ends = bar_bounds(candles.timestamp, timeframe, calendar)
+    in_session = starts >= 0
+    if not in_session.all():
+        candles = CandleStore.from_arrays(**{name: getattr(candles, name)[in_session] for name in COLUMNS})
+        starts, ends = starts[in_session], ends[in_session]
+    if not len(candles):
+        return CandleStore(capacity=0)
+
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:], len(starts)] - 1
+    if complete_only and candles.timestamp[-1] + timeframe_to_ms(base_timeframe) < ends[-1]:
+        first, last = first[:-1], last[:-1]
+        if not len(first):
+            return CandleStore(capacity=0)
+        candles = candles[: last[-1] + 1]
+
+    return CandleStore.from_arrays(
+        timestamp=starts[first],
+        open=candles.open[first],
+        high=np.maximum.reduceat(candles.high, first),
+        low=np.minimum.reduceat(candles.low, first),
+        close=candles.close[last],
+        volume=np.add.reduceat(candles.volume, first),
+    )
+
+
+def bar_bounds(
+    timestamps: npt.NDArray[np.int64], timeframe: str, calendar: MarketCalendar | None = None
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    The start and (exclusive) end of the ``timeframe`` bar each timestamp falls in, aligned as described in
+    ``resample``. Timestamps outside the calendar's sessions get a start and end of -1.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    timeframe_ms = _check_timeframe(timeframe, calendar)
+    if calendar is None:
+        starts = timestamps - timestamps % timeframe_ms
+        return starts, starts + timeframe_ms
+
+    if not len(timestamps):
+        return timestamps.copy(), timestamps.copy()
+    sessions = np.array(calendar.sessions(int(timestamps[0]), int(timestamps[-1])), dtype=np.int64).reshape(-1, 2)
+    if not len(sessions):
+        return np.full_like(timestamps, -1), np.full_like(timestamps, -1)
+    session = np.maximum(np.searchsorted(sessions[:, 0], timestamps, side="right") - 1, 0)
+    opens, closes = sessions[session, 0], sessions[session, 1]
+    in_session = (timestamps >= opens) & (timestamps < closes)
+
+    if timeframe == "1D":
+        starts, ends = opens, closes
+    else:
+        starts = opens + (timestamps - opens) // timeframe_ms * timeframe_ms
+        ends = np.minimum(starts + timeframe_ms, closes)
+    return np.where(in_session, starts, -1), np.where(in_session, ends, -1)
+
+
+class BarAggregator:
+    """
+    Builds ``timeframe`` bars one ``base_timeframe`` candle at a time, aligned like ``resample``. ``candles`` holds
+    the completed bars and ``partial`` the bar in progress. A bar is completed by the candle that reaches its end,
+    or by the first candle of a later bar if the candles of its end are missing, so each update only touches the
+    bar in progress.
+    """
+
+    def __init__(
+        self,
+        timeframe: str,
+        calendar: MarketCalendar | None = None,
+        base_timeframe: str = "1m",
+        max_lookback: int | None = None,
+    ):
+        self.timeframe = timeframe
+        self.calendar = calendar
+        self.timeframe_ms = _check_timeframe(timeframe, calendar)
+        self.base_timeframe_ms = timeframe_to_ms(base_timeframe)
+        self.candles = CandleStore(max_lookback=max_lookback)
+        self._bar: list | None = None  # [start, end, open, high, low, close, volume] of the partial bar
+        self._session: tuple[int, int] | None = None
+
+    @property
+    def partial(self) -> CandleRow | None:
+        if self._bar is None:
+            return None
+        start, _, open_, high, low, close, volume = self._bar
+        return CandleRow(timestamp=start, open=open_, high=high, low=low, close=close, volume=volume)
+
+    def update(self, candle: Candle | CandleRow) -> list[CandleRow]:
+        """Add a candle to the bar in progress and return the bars this completed."""
+        bounds = self._bounds(candle.timestamp)
+        if bounds is None:
+            return []
+        completed = []
+        if self._bar is not None and self._bar[0] != bounds[0]:
+            completed.append(self._complete())
+        if self._bar is None:
+            self._bar = [*bounds, candle.open, candle.high, candle.low, candle.close, candle.volume]
+        else:
+            bar = self._bar
+            bar[3] = max(bar[3], candle.high)
+            bar[4] = min(bar[4], candle.low)
+            bar[5] = candle.close
+            bar[6] += candle.volume
+        if candle.timestamp + self.base_timeframe_ms >= bounds[1]:
+            completed.append(self._complete())
+        return completed
+
+    def _complete(self) -> CandleRow:
+        bar = self.partial
+        self.candles.add_candle(bar)
+        self._bar = None
+        return bar
+
+    def _bounds(self, timestamp: int) -> tuple[int, int] | None:
+        if self.calendar is None:
+            start = timestamp - timestamp % self.timeframe_ms
+            return start, start + self.timeframe_ms
+
+        if self._session is None or timestamp >= self._session[1]:
+            upcoming = self.calendar.sessions(timestamp, timestamp + 7 * 86_400_000)
+            self._session = upcoming[0] if upcoming else None
+        if self._session is None or timestamp < self._session[0]:
+            return None
+        open_, close = self._session
+        if self.timeframe == "1D":
+            return open_, close
+        start = open_ + (timestamp - open_) // self.timeframe_ms * self.timeframe_ms
+        return start, min(start + self.timeframe_ms, close)
+
+
+def _check_timeframe(timeframe: str, calendar: MarketCalendar | None) -> int:
+    if calendar is not None and timeframe.endswith("D") and timeframe != "1D":
+        raise ValueError("Session aligned bars can be intraday or 1D")
+    return timeframe_to_ms(timeframe)
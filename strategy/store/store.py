@@ -1,6 +1,56 @@
-from strategy.store.candles import CandleStore
+from strategy.db.candle import Candle
+from strategy.indicators.incremental.base import IncrementalIndicator
+from strategy.market_calendar import MarketCalendar
+from strategy.store.candles import CandleRow, CandleStore
+from strategy.store.resample import BarAggregator
 
 
 class Store:
-    def __init__(self):
-        self.candles = CandleStore()
+    """
+    The candles a strategy has seen, plus the incremental indicators updated with them.
+
+    ``timeframes`` are higher timeframes built from the incoming candles as they arrive, each a BarAggregator whose
+    ``candles`` hold the completed bars and ``partial`` the bar in progress, e.g. ``store.timeframes["1h"].candles``.
+    Indicators registered for a timeframe are updated with its bars as they complete.
+    """
+
+    def __init__(
+        self,
+        max_lookback: int | None = None,
+        timeframes: list[str] | None = None,
+        calendar: MarketCalendar | None = None,
+    ):
+        self.max_lookback = max_lookback
+        self.candles = CandleStore(max_lookback=max_lookback)
+        self.indicators: dict[str, IncrementalIndicator] = {}
+        self.timeframes: dict[str, BarAggregator] = {}
+        self._indicators_by_timeframe: dict[str | None, list[IncrementalIndicator]] = {None: []}
+        for timeframe in timeframes or []:
+            self.add_timeframe(timeframe, calendar)
+
+    def add_timeframe(self, timeframe: str, calendar: MarketCalendar | None = None) -> BarAggregator:
+        if timeframe in self.timeframes:
+            raise ValueError(f"Timeframe {timeframe} is already tracked")
+        self.timeframes[timeframe] = BarAggregator(timeframe, calendar, max_lookback=self.max_lookback)
+        self._indicators_by_timeframe[timeframe] = []
+        return self.timeframes[timeframe]
+
+    def register_indicator(
+        self, name: str, indicator: IncrementalIndicator, timeframe: str | None = None
+    ) -> IncrementalIndicator:
+        if name in self.indicators:
+            raise ValueError(f"Indicator {name} is already registered")
+        if timeframe is not None and timeframe not in self.timeframes:
+            raise ValueError(f"Timeframe {timeframe} is not tracked")
+        self.indicators[name] = indicator
+        self._indicators_by_timeframe[timeframe].append(indicator)
+        return indicator
+
+    def add_candle(self, candle: Candle | CandleRow):
+        self.candles.add_candle(candle)
+        for indicator in self._indicators_by_timeframe[None]:
+            indicator.update(candle)
+        for timeframe, aggregator in self.timeframes.items():
+            for bar in aggregator.update(candle):
+                for indicator in self._indicators_by_timeframe[timeframe]:
+                    indicator.update(bar)
@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 
+import numpy as np
+import numpy.typing as npt
+
+from strategy.store.candles import CandleStore
 from strategy.store.store import Store
 
 
@@ -35,3 +39,36 @@ class Strategy(ABC):
     @abstractmethod
     def should_cancel_entry(self) -> bool:
         pass
+
+
+@dataclass
+class Signals:
+    """
+    Per-bar signals of a VectorizedStrategy, aligned with the candles they were generated from.
+
+    ``long_entries``/``short_entries`` play the part of ``should_long``/``should_short`` and ``exits`` the part of
+    ``should_cancel_entry``. ``price``, ``quantity``, ``stop_loss`` and ``take_profit`` describe the order placed when
+    entering on a bar; ``price`` defaults to the close, and a NaN or zero stop loss/take profit means none.
+    """
+
+    long_entries: npt.NDArray[np.bool_]
+    short_entries: npt.NDArray[np.bool_] | None = None
+    exits: npt.NDArray[np.bool_] | None = None
+    price: npt.NDArray[np.float64] | None = None
+    quantity: float | npt.NDArray[np.float64] = 1
+    stop_loss: float | npt.NDArray[np.float64] | None = None
+    take_profit: float | npt.NDArray[np.float64] | None = None
+
+    def __getitem__(self, item: slice) -> "Signals":
+        """The signals for a range of bars; scalar fields apply to every bar and are kept as they are."""
+        return Signals(**{f.name: _slice(getattr(self, f.name), item) for f in fields(self)})
+
+
+class VectorizedStrategy(ABC):
+    @abstractmethod
+    def generate_signals(self, candles: CandleStore) -> Signals:
+        pass
+
+
+def _slice(value, item: slice):
+    return value[item] if np.ndim(value) else value
@@ -0,0 +1,6 @@
+from strategy.db.candle import Candle
+
+
+def to_db_candles(raw_candles: list[tuple[float]]) -> list[Candle]:
+    """Candles from the ``(timestamp, open, close, high, low, volume)`` tuples of the test data."""
+    return [Candle(timestamp=c[0], open=c[1], close=c[2], high=c[3], low=c[4], volume=c[5]) for c in raw_candles]
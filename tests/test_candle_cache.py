@@ -0,0 +1,50 @@
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from strategy.store.cache import CandleCache, month_ranges
+from strategy.store.candles import COLUMNS
+
+JAN_2024 = 1_704_067_200_000
+FEB_2024 = 1_706_745_600_000
+MAR_2024 = 1_709_251_200_000
+
+
+class TestCandleCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = CandleCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_month_ranges(self):
+        self.assertEqual(
+            month_ranges(JAN_2024 + 60_000, FEB_2024),
+            [(JAN_2024, FEB_2024 - 1), (FEB_2024, MAR_2024 - 1)],
+        )
+
+    def test_round_trip(self):
+        columns = {name: np.arange(5, dtype=dtype) for name, dtype in COLUMNS.items()}
+        columns["timestamp"] = JAN_2024 + columns["timestamp"] * 60_000
+
+        self.assertIsNone(self.cache.read("alpaca", "AAPL", "1m", JAN_2024))
+        self.cache.write("alpaca", "AAPL", "1m", JAN_2024, columns)
+        cached = self.cache.read("alpaca", "AAPL", "1m", JAN_2024)
+
+        self.assertEqual(self.cache.path("alpaca", "AAPL", "1m", JAN_2024).name, "2024-01.parquet")
+        for name, dtype in COLUMNS.items():
+            self.assertEqual(cached[name].dtype, dtype)
+            np.testing.assert_array_equal(cached[name], columns[name])
+
+    def test_invalidate(self):
+        empty = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        for month in (JAN_2024, FEB_2024, MAR_2024):
+            self.cache.write("alpaca", "AAPL", "1m", month, empty)
+
+        self.cache.invalidate("alpaca", "AAPL", "1m", FEB_2024 - 60_000, FEB_2024 + 60_000)
+
+        self.assertIsNotNone(self.cache.read("alpaca", "AAPL", "1m", MAR_2024))
+        self.assertIsNone(self.cache.read("alpaca", "AAPL", "1m", JAN_2024))
+        self.assertIsNone(self.cache.read("alpaca", "AAPL", "1m", FEB_2024))
@@ -0,0 +1,57 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from strategy.db.candle import Candle
+from strategy.store.candle_file import open_candles, save_candles
+from strategy.store.candles import COLUMNS, CandleStore
+from .conftest import to_db_candles
+from .data.test_candle_indicators import test_candles_10
+
+
+class TestCandleFile(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "AAPL.candles"
+        self.candles = CandleStore.from_candles(to_db_candles(test_candles_10))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        save_candles(self.path, self.candles)
+        mapped = open_candles(self.path)
+
+        self.assertEqual(len(mapped), len(self.candles))
+        for name, dtype in COLUMNS.items():
+            self.assertEqual(getattr(mapped, name).dtype, dtype)
+            self.assertFalse(getattr(mapped, name).flags.writeable)
+            np.testing.assert_array_equal(getattr(mapped, name), getattr(self.candles, name))
+
+    def test_read_only(self):
+        save_candles(self.path, self.candles)
+        mapped = open_candles(self.path)
+
+        with self.assertRaises(ValueError):
+            mapped.close[0] = 0
+        mapped.add_candle(Candle(timestamp=1, open=1, high=1, low=1, close=1, volume=1))
+        self.assertEqual(len(mapped), len(self.candles) + 1)
+        np.testing.assert_array_equal(open_candles(self.path).close, self.candles.close)
+
+    def test_partial_files_of_other_writers_are_left_alone(self):
+        other = self.path.with_name(f"{self.path.name}.{os.getpid() + 1}.tmp")
+        other.write_bytes(b"partial")
+
+        save_candles(self.path, self.candles)
+
+        self.assertEqual(other.read_bytes(), b"partial")
+        np.testing.assert_array_equal(open_candles(self.path).close, self.candles.close)
+        self.assertEqual(sorted(p.name for p in self.path.parent.iterdir()), [self.path.name, other.name])
+
+    def test_not_a_candle_file(self):
+        self.path.write_bytes(b"timestamp,open,high,low,close,volume\n")
+        with self.assertRaises(ValueError):
+            open_candles(self.path)
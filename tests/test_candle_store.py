@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+import numpy as np
+
+import strategy.indicators as si
+from strategy.store.candles import COLUMNS, CandleStore
+from .conftest import to_db_candles
+from .data.test_candle_indicators import test_candles_10
+
+
+class TestCandleStore(TestCase):
+    def test_add_candle_grows(self):
+        candles = to_db_candles(test_candles_10)
+        store = CandleStore(capacity=2)
+        for c in candles:
+            store.add_candle(c)
+
+        self.assertEqual(len(store), len(candles))
+        np.testing.assert_array_equal(store.timestamp, [c.timestamp for c in candles])
+        np.testing.assert_array_equal(store.close, [c.close for c in candles])
+        self.assertEqual(store.most_recent_candle.close, candles[-1].close)
+        self.assertEqual(store.most_recent_candle.timestamp, candles[-1].timestamp)
+
+    def test_slices_are_views(self):
+        store = CandleStore.from_candles(to_db_candles(test_candles_10))
+        self.assertTrue(np.shares_memory(store.close[-200:], store.close))
+
+    def test_empty_store(self):
+        store = CandleStore()
+        self.assertEqual(len(store.close), 0)
+        with self.assertRaises(IndexError):
+            _ = store.most_recent_candle
+
+    def test_indicator_on_store(self):
+        candles = to_db_candles(test_candles_10)
+        np.testing.assert_array_equal(si.adx(CandleStore.from_candles(candles)), si.adx(candles))
+
+    def test_extend(self):
+        candles = to_db_candles(test_candles_10)
+        expected = CandleStore.from_candles(candles)
+        columns = {name: getattr(expected, name) for name in COLUMNS}
+
+        store = CandleStore(capacity=2)
+        store.add_candle(candles[0])
+        store.extend(**{name: values[1:5] for name, values in columns.items()})
+        store.extend(**{name: values[5:] for name, values in columns.items()})
+        np.testing.assert_array_equal(store.close, expected.close)
+        np.testing.assert_array_equal(store.timestamp, expected.timestamp)
+
+        ring = CandleStore(max_lookback=5)
+        for start in range(0, len(candles), 3):
+            ring.extend(**{name: values[start : start + 3] for name, values in columns.items()})
+            np.testing.assert_array_equal(ring.close, expected.close[max(0, start - 2) : start + 3])
+        ring.extend(**columns)
+        np.testing.assert_array_equal(ring.close, expected.close[-5:])
+
+    def test_ring_buffer_keeps_most_recent(self):
+        candles = to_db_candles(test_candles_10)
+        store = CandleStore(max_lookback=5)
+        buffer = store._columns["close"]
+        for i, c in enumerate(candles):
+            store.add_candle(c)
+            expected = candles[max(0, i - 4) : i + 1]
+            np.testing.assert_array_equal(store.close, [c.close for c in expected])
+
+        self.assertEqual(len(store), 5)
+        self.assertTrue(store.close.flags.c_contiguous)
+        self.assertIs(store._columns["close"], buffer)
+        self.assertEqual(store.most_recent_candle.timestamp, candles[-1].timestamp)
+
+    def test_ring_buffer_invalid_lookback(self):
+        with self.assertRaises(ValueError):
+            CandleStore(max_lookback=0)
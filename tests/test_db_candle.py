@@ -0,0 +1,95 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+import strategy.db.candle as candle
+from strategy.db.base import engine
+from strategy.db.candle import ensure_partitions, market_clause
+
+YEAR_2023 = 1_672_531_200_000
+YEAR_2024 = 1_704_067_200_000
+YEAR_2025 = 1_735_689_600_000
+
+
+class TestMarketClause(TestCase):
+    def compile(self, clause) -> str:
+        return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    def test_known_market(self):
+        with patch.object(candle, "instrument_id", return_value=7) as instrument_id, patch.object(
+            candle, "timeframe_id", return_value=1
+        ) as timeframe_id:
+            clause = market_clause("alpaca", "AAPL", "1m")
+
+        self.assertEqual(self.compile(clause), "candles.instrument_id = 7 AND candles.timeframe_id = 1")
+        instrument_id.assert_called_once_with("alpaca", "AAPL")
+        timeframe_id.assert_called_once_with("1m")
+
+    def test_unknown_market_matches_nothing(self):
+        with patch.object(candle, "instrument_id", return_value=None), patch.object(
+            candle, "timeframe_id", return_value=1
+        ):
+            self.assertEqual(self.compile(market_clause("alpaca", "NEW", "1m")), "false")
+
+
+class TestEnsurePartitions(TestCase):
+    def setUp(self):
+        patcher = patch.object(candle, "_partitions", set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_creates_missing_years_once(self):
+        connection = MagicMock()
+        ensure_partitions(connection, YEAR_2024 - 60_000, YEAR_2024)
+
+        statements = [str(call.args[0]) for call in connection.execute.call_args_list]
+        self.assertIn("pg_advisory_xact_lock", statements[0])
+        self.assertEqual(
+            statements[1:],
+            [
+                f"CREATE TABLE IF NOT EXISTS candles_2023 PARTITION OF candles FOR VALUES FROM ({YEAR_2023}) TO "
+                f"({YEAR_2024})",
+                f"CREATE TABLE IF NOT EXISTS candles_2024 PARTITION OF candles FOR VALUES FROM ({YEAR_2024}) TO "
+                f"({YEAR_2025})",
+            ],
+        )
+
+        connection.reset_mock()
+        ensure_partitions(connection, YEAR_2023, YEAR_2025 - 1)
+        connection.execute.assert_not_called()
+
+
+class TestEnsurePartitionsInDatabase(TestCase):
+    year_2099 = 4_070_908_800_000
+
+    def setUp(self):
+        try:
+            engine.connect().close()
+        except OperationalError:
+            self.skipTest("needs a Postgres database")
+        patcher = patch.object(candle, "_partitions", set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.drop_partition)
+
+    @staticmethod
+    def drop_partition():
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS candles_2099"))
+
+    def test_creates_partition(self):
+        with engine.begin() as connection:
+            ensure_partitions(connection, self.year_2099, self.year_2099)
+        # a process that has not seen the partition yet creates it again without error
+        candle._partitions.clear()
+        with engine.begin() as connection:
+            ensure_partitions(connection, self.year_2099, self.year_2099)
+
+        with engine.connect() as connection:
+            parent = connection.execute(
+                text("SELECT inhparent::regclass::text FROM pg_inherits WHERE inhrelid = 'candles_2099'::regclass")
+            ).scalar()
+        self.assertEqual(parent, "candles")
@@ -0,0 +1,100 @@
+import os
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from strategy.modes.import_candles_mode.drivers.alpaca import AlpacaExchange
+from strategy.modes.import_candles_mode.drivers.base_candles_exchange import RETRY_STATUSES, CandleExchange
+from strategy.modes.import_candles_mode.drivers.fake import FakeExchange
+
+
+class TestCandleExchange(TestCase):
+    def test_fetch_range_pages(self):
+        driver = FakeExchange(count=100, skip_every=7)
+        start, end = 1_700_000_040_000, 1_700_000_040_000 + 249 * 60_000
+
+        pages = list(driver.fetch_range("FAKE", start, end))
+
+        self.assertEqual(driver.requests, 3)
+        self.assertTrue(all(pages))
+        timestamps = [c["timestamp"] for page in pages for c in page]
+        expected = [c["timestamp"] for c in driver.fetch("FAKE", start) + driver.fetch("FAKE", start + 100 * 60_000)]
+        expected += [c["timestamp"] for c in driver.fetch("FAKE", start + 200 * 60_000) if c["timestamp"] <= end]
+        self.assertEqual(timestamps, expected)
+
+    def test_session(self):
+        session = CandleExchange._create_session(pool_size=4, max_retries=5, backoff_factor=0.25)
+
+        for url in ("https://example.com", "http://example.com"):
+            adapter = session.get_adapter(url)
+            self.assertEqual(adapter.max_retries.total, 5)
+            self.assertEqual(adapter.max_retries.backoff_factor, 0.25)
+            self.assertEqual(tuple(adapter.max_retries.status_forcelist), RETRY_STATUSES)
+            self.assertEqual(adapter.max_retries.allowed_methods, frozenset(["GET"]))
+            self.assertEqual(adapter.poolmanager.connection_pool_kw["maxsize"], 4)
+        self.assertEqual(session.headers["Accept-Encoding"], "gzip, deflate")
+
+    def test_get(self):
+        driver = FakeExchange()
+        driver.timeout = 12
+        driver.limiter = MagicMock()
+        response = MagicMock(status_code=200)
+        with patch.object(driver.session, "get", return_value=response) as get, patch.object(
+            driver, "validate_response"
+        ) as validate_response:
+            self.assertIs(driver.get("https://example.com/bars", params={"limit": 1}), response)
+
+        driver.limiter.acquire.assert_called_once_with()
+        get.assert_called_once_with("https://example.com/bars", params={"limit": 1}, timeout=12)
+        validate_response.assert_called_once_with(response)
+
+        with patch.object(driver.session, "get", return_value=MagicMock(status_code=503, reason="Unavailable")):
+            with self.assertRaises(ConnectionError):
+                driver.get("https://example.com/bars")
+
+    def test_close(self):
+        driver = FakeExchange()
+        with patch.object(driver.session, "close") as close:
+            driver.close()
+        close.assert_called_once_with()
+
+        with patch.object(driver.session, "close") as close:
+            with driver as entered:
+                self.assertIs(entered, driver)
+            close.assert_called_once_with()
+
+
+class TestAlpacaExchange(TestCase):
+    start = 1_704_205_800_000  # 2024-01-02 14:30 UTC
+
+    @staticmethod
+    def bar(iso_time: str) -> dict:
+        return {"t": iso_time, "o": 1.0, "h": 2.0, "l": 0.5, "c": 1.5, "v": 100}
+
+    def test_fetch_range_follows_page_tokens(self):
+        with patch.dict(os.environ, {"APCA_API_KEY_ID": "key", "APCA_API_SECRET_KEY": "secret"}):
+            driver = AlpacaExchange()
+        responses = [
+            {"bars": [self.bar("2024-01-02T14:30:00Z"), self.bar("2024-01-02T14:31:00Z")], "next_page_token": "a"},
+            {"bars": [], "next_page_token": "b"},
+            {"bars": [self.bar("2024-01-02T14:35:00Z")], "next_page_token": None},
+        ]
+        sent = []
+
+        def get(url: str, params: dict | None = None):
+            # the driver updates one params dict between requests, so keep a copy of each
+            sent.append(dict(params))
+            return MagicMock(json=MagicMock(return_value=responses[len(sent) - 1]))
+
+        with patch.object(driver, "get", side_effect=get):
+            pages = list(driver.fetch_range("AAPL", self.start, self.start + 10 * 60_000))
+
+        self.assertEqual(
+            [[c["timestamp"] for c in page] for page in pages],
+            [[self.start, self.start + 60_000], [self.start + 5 * 60_000]],
+        )
+        self.assertEqual(pages[0][0]["exchange"], "alpaca")
+        self.assertEqual([params.get("page_token") for params in sent], [None, "a", "b"])
+        for params in sent:
+            self.assertEqual(params["start"], "2024-01-02T14:30:00Z")
+            self.assertEqual(params["end"], "2024-01-02T14:40:00Z")
+            self.assertEqual(params["timeframe"], "1Min")
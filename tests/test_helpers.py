@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from unittest import TestCase
+
+import arrow
+import numpy as np
+
+import strategy.helpers as sh
+
+
+class TestTimestampConversion(TestCase):
+    def setUp(self):
+        self.timestamps = np.array([0, 1_704_205_800_000, 1_704_205_800_250, 1_735_689_599_000], dtype=np.int64)
+        self.iso_times = [str(arrow.get(timestamp / 1000)) for timestamp in self.timestamps.tolist()]
+
+    def test_iso_to_timestamps(self):
+        np.testing.assert_array_equal(sh.iso_to_timestamps(self.iso_times), self.timestamps)
+        np.testing.assert_array_equal(
+            sh.iso_to_timestamps(["2024-01-02T14:30:00Z", "2024-01-02T14:30:00"]), [1_704_205_800_000] * 2
+        )
+        self.assertEqual(sh.iso_to_timestamps([]).dtype, np.int64)
+
+    def test_timestamps_to_iso(self):
+        iso_times = sh.timestamps_to_iso(self.timestamps)
+
+        self.assertEqual(iso_times[1], "2024-01-02T14:30:00Z")
+        np.testing.assert_array_equal(sh.iso_to_timestamps(iso_times), self.timestamps // 1000 * 1000)
+
+    def test_datetime64(self):
+        times = sh.timestamps_to_datetime64(self.timestamps)
+
+        self.assertEqual(times[1], np.datetime64("2024-01-02T14:30:00", "ms"))
+        np.testing.assert_array_equal(sh.datetime64_to_timestamps(times), self.timestamps)
+
+    def test_scalar_conversions_match_arrow(self):
+        for timestamp in self.timestamps.tolist():
+            self.assertEqual(sh.timestamp_to_time(timestamp), str(arrow.get(timestamp / 1000)))
+            self.assertEqual(sh.timestamp_to_datetime(timestamp), arrow.get(timestamp / 1000).datetime)
+        self.assertEqual(sh.timestamp_to_datetime(0).tzinfo, timezone.utc)
+        self.assertEqual(sh.timestamp_to_datetime(0), datetime(1970, 1, 1, tzinfo=timezone.utc))
@@ -0,0 +1,622 @@
+import csv
+import os
+import threading
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import arrow
+import numpy as np
+from sqlalchemy import delete
+from sqlalchemy.exc import OperationalError
+
+import strategy.helpers as sh
+import strategy.modes.import_candles_mode as import_candles_mode
+from strategy.db.base import SessionLocal, engine
+from strategy.db.candle import Candle, market_clause
+from strategy.market_calendar import NYSECalendar
+from strategy.modes.import_candles_mode import (
+    _candle_rows,
+    _fill_absent_candles,
+    _import_range,
+    run,
+    run_many,
+    store_candles_list,
+)
+from strategy.modes.import_candles_mode.drivers.alpaca import AlpacaExchange
+from strategy.modes.import_candles_mode.drivers.fake import FakeExchange, fake_candles
+from strategy.modes.import_candles_mode.planner import get_coverage, plan_missing_windows
+from strategy.modes.import_candles_mode.rate_limiter import TokenBucket
+from .data.test_candle_indicators import test_candles_btc
+
+
+class TestFillAbsentCandles(TestCase):
+    @staticmethod
+    def to_candle_dicts(raw_candles: list[tuple[float]]) -> list[dict]:
+        return [
+            {
+                "id": str(i),
+                "exchange": "alpaca",
+                "symbol": "BTC",
+                "timeframe": "1m",
+                "timestamp": 1_600_000_000_000 + i * 60_000,
+                "open": c[1],
+                "close": c[2],
+                "high": c[3],
+                "low": c[4],
+                "volume": c[5],
+            }
+            for i, c in enumerate(raw_candles)
+        ]
+
+    def test_fills_gaps(self):
+        candles = self.to_candle_dicts(test_candles_btc[:5])
+        fetched = [candles[1], candles[3]]
+        start, end = candles[0]["timestamp"], candles[4]["timestamp"]
+
+        filled = _fill_absent_candles(fetched, start, end)
+
+        self.assertEqual([c["timestamp"] for c in filled], [c["timestamp"] for c in candles])
+        self.assertIs(filled[1], candles[1])
+        self.assertIs(filled[3], candles[3])
+        self.assertEqual(filled[0]["close"], candles[1]["open"])
+        self.assertEqual(filled[2]["open"], candles[1]["close"])
+        self.assertEqual(filled[4]["high"], candles[3]["close"])
+        self.assertEqual([filled[i]["volume"] for i in (0, 2, 4)], [0, 0, 0])
+        # ids of filler candles are left to the database
+        self.assertNotIn("id", filled[0])
+
+    def test_fills_from_previous_close(self):
+        candles = self.to_candle_dicts(test_candles_btc[:3])
+        start, end = candles[0]["timestamp"], candles[2]["timestamp"]
+
+        filled = _fill_absent_candles(candles[2:], start, end, previous_close=123.0)
+        arrays = _fill_absent_candles(candles[2:], start, end, as_arrays=True, previous_close=123.0)
+
+        self.assertEqual([c["close"] for c in filled[:2]], [123.0, 123.0])
+        np.testing.assert_array_equal(arrays["close"], [c["close"] for c in filled])
+
+    def test_fills_within_sessions(self):
+        calendar = NYSECalendar()
+        friday_close = 1_704_488_400_000  # 2024-01-05 16:00 New York
+        monday_open = friday_close + (2 * 24 * 60 + 17 * 60 + 30) * 60_000
+        candles = self.to_candle_dicts(test_candles_btc[:3])
+        for candle, timestamp in zip(candles, (friday_close - 120_000, friday_close + 60_000, monday_open + 60_000)):
+            candle["timestamp"] = timestamp
+
+        filled = _fill_absent_candles(candles, friday_close - 120_000, monday_open + 120_000, calendar=calendar)
+        arrays = _fill_absent_candles(
+            candles, friday_close - 120_000, monday_open + 120_000, as_arrays=True, calendar=calendar
+        )
+
+        self.assertEqual(
+            [c["timestamp"] for c in filled],
+            [
+                friday_close - 120_000,
+                friday_close - 60_000,
+                friday_close + 60_000,
+                monday_open,
+                monday_open + 60_000,
+                monday_open + 120_000,
+            ],
+        )
+        self.assertEqual(filled[3]["close"], candles[1]["close"])
+        np.testing.assert_array_equal(arrays["timestamp"], [c["timestamp"] for c in filled])
+
+    def test_arrays_match_dicts(self):
+        candles = self.to_candle_dicts(test_candles_btc)
+        rng = np.random.default_rng(0)
+        fetched = [c for c in candles if rng.random() < 0.6]
+        fetched = fetched + fetched[:10]
+        rng.shuffle(fetched)
+        start, end = candles[0]["timestamp"] - 120_000, candles[-1]["timestamp"] + 120_000
+
+        filled = _fill_absent_candles(fetched, start, end)
+        arrays = _fill_absent_candles(fetched, start, end, as_arrays=True)
+
+        for name in ("timestamp", "open", "high", "low", "close", "volume"):
+            np.testing.assert_array_equal(arrays[name], [c[name] for c in filled])
+
+
+class TestImportRange(TestCase):
+    start = 1_700_000_400_000  # a multiple of 7 minutes, so with skip_every=7 the first minute has no candle
+
+    def import_range(self, driver, end, followed_by_coverage=False, previous_close=None, fill_gaps=True):
+        stored = []
+        with patch.object(import_candles_mode, "store_candles_list", stored.append), patch.object(
+            import_candles_mode, "_get_previous_close", return_value=previous_close
+        ):
+            _import_range(driver, "fake", "FAKE", self.start, end, followed_by_coverage, fill_gaps)
+        return stored
+
+    def test_fills_before_the_first_candle_without_previous_close(self):
+        driver = FakeExchange(count=100, starting_time=self.start + 10 * 60_000)
+        end = self.start + 59 * 60_000
+
+        stored = self.import_range(driver, end)
+
+        candles = [c for page in stored for c in page]
+        self.assertEqual(candles[0]["timestamp"], self.start)
+        self.assertEqual([c["close"] for c in candles[:10]], [candles[10]["open"]] * 10)
+        self.assertEqual([c["timestamp"] for c in candles[10:]], [c["timestamp"] for c in driver.fetch("FAKE", 0)][:50])
+
+    def test_fills_across_pages_from_previous_close(self):
+        driver = FakeExchange(count=20, skip_every=7)
+        end = self.start + 63 * 60_000  # also a minute without a candle
+
+        stored = self.import_range(driver, end, followed_by_coverage=True, previous_close=42.0)
+
+        self.assertEqual(len(stored), 4)
+        candles = [c for page in stored for c in page]
+        self.assertEqual([c["timestamp"] for c in candles], list(range(self.start, end + 1, 60_000)))
+        self.assertEqual(candles[0]["close"], 42.0)
+        self.assertEqual(candles[7]["close"], candles[6]["close"])
+        self.assertEqual(candles[-1]["volume"], 0)
+
+    def test_not_filled_past_the_last_candle_without_following_coverage(self):
+        driver = FakeExchange(count=20, skip_every=7)
+        end = self.start + 63 * 60_000
+
+        stored = self.import_range(driver, end, previous_close=42.0)
+
+        self.assertEqual(stored[-1][-1]["timestamp"], end - 60_000)
+
+    def test_stores_pages_as_fetched_without_filling(self):
+        driver = FakeExchange(count=20, skip_every=7)
+        end = self.start + 63 * 60_000
+
+        stored = self.import_range(driver, end, followed_by_coverage=True, previous_close=42.0, fill_gaps=False)
+
+        self.assertEqual(stored, list(FakeExchange(count=20, skip_every=7).fetch_range("FAKE", self.start, end)))
+
+    def test_nothing_stored_for_an_empty_range(self):
+        driver = FakeExchange(count=20, starting_time=self.start + 120 * 60_000)
+
+        self.assertEqual(self.import_range(driver, self.start + 60 * 60_000), [])
+
+
+class FakeAlpacaBars:
+    """Serves every minute of Alpaca's extended-hours sessions, except every 11th, a page of ``limit`` at a time."""
+
+    def __init__(self, start: int, end: int):
+        minutes = NYSECalendar(extended_hours=True).trading_minutes(start, end)
+        minutes = minutes[np.arange(len(minutes)) % 11 != 0]
+        self.bars = [
+            {"t": t, "o": float(i), "h": i + 1.0, "l": i - 1.0, "c": i + 0.5, "v": 100}
+            for i, t in enumerate(sh.timestamps_to_iso(minutes).tolist())
+        ]
+        self.timestamps = minutes
+
+    def get(self, url: str, params: dict):
+        start, end = sh.iso_to_timestamps([params["start"], params["end"]])
+        first, last = int(np.searchsorted(self.timestamps, start)), int(np.searchsorted(self.timestamps, end, "right"))
+        offset = int(params.get("page_token") or first)
+        bars = self.bars[offset : min(offset + params["limit"], last)]
+        next_offset = offset + len(bars)
+        response = {"bars": bars, "next_page_token": str(next_offset) if next_offset < last else None}
+        return MagicMock(json=MagicMock(return_value=response))
+
+
+class TestAlpacaImportSchedules(TestCase):
+    monday = 1_704_672_000_000  # 2024-01-08 00:00 UTC
+
+    def import_candles(self, run_ends: list[int]) -> dict[int, dict]:
+        """Import like successive runs ending at ``run_ends``, each planned from what the previous runs stored."""
+        with patch.dict(os.environ, {"APCA_API_KEY_ID": "key", "APCA_API_SECRET_KEY": "secret"}):
+            driver = AlpacaExchange()
+        driver.count = 500
+        server = FakeAlpacaBars(self.monday, run_ends[-1])
+        stored = {}
+
+        def store(candles: list[dict]):
+            for c in candles:
+                stored.setdefault(c["timestamp"], c)
+
+        def previous_close(exchange: str, symbol: str, timestamp: int) -> float | None:
+            earlier = [t for t in stored if t < timestamp]
+            return stored[max(earlier)]["close"] if earlier else None
+
+        with patch.object(driver, "get", side_effect=server.get), patch.object(
+            import_candles_mode, "store_candles_list", side_effect=store
+        ), patch.object(import_candles_mode, "_get_previous_close", side_effect=previous_close):
+            for end in run_ends:
+                coverage = self.coverage(sorted(stored))
+                for first, last in plan_missing_windows(coverage, self.monday, end, calendar=driver.calendar):
+                    _import_range(driver, "alpaca", "AAPL", first, last, last < end)
+        return stored
+
+    @staticmethod
+    def coverage(timestamps: list[int]) -> list[tuple[int, int]]:
+        runs = []
+        for timestamp in timestamps:
+            if runs and runs[-1][1] == timestamp - 60_000:
+                runs[-1][1] = timestamp
+            else:
+                runs.append([timestamp, timestamp])
+        return [tuple(run) for run in runs]
+
+    def test_backfill_and_nightly_runs_store_the_same_candles(self):
+        day = 24 * 60 * 60_000
+        nightly = [self.monday + (i + 1) * day - 60_000 for i in range(3)]
+
+        backfill = self.import_candles(nightly[-1:])
+        topped_up = self.import_candles(nightly)
+
+        self.assertEqual(backfill, topped_up)
+        # regular hours only, with the minutes Alpaca has no bar for filled
+        self.assertEqual(sorted(backfill), NYSECalendar().trading_minutes(self.monday, max(backfill)).tolist())
+        self.assertIn(0, [c["volume"] for c in backfill.values()])
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements = []
+        self.copied = []
+
+    def execute(self, statement: str):
+        self.statements.append(statement)
+
+    def copy_expert(self, statement: str, buffer):
+        self.copied.append(list(csv.reader(buffer)))
+
+
+class CursorWithoutCopy:
+    def execute(self, statement: str):
+        raise AssertionError("nothing should be executed without COPY support")
+
+
+class FakeRawConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = False
+        self.rolled_back = False
+        self.closed = False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+class TestStoreCandles(TestCase):
+    def setUp(self):
+        # no database: markets resolve to fixed ids and partitions are assumed to exist
+        for name, value in {
+            "ensure_partitions": MagicMock(),
+            "instrument_id": MagicMock(return_value=7),
+            "timeframe_id": MagicMock(return_value=1),
+            "candle_cache": MagicMock(),
+        }.items():
+            patcher = patch.object(import_candles_mode, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(engine, "begin", MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.candles = fake_candles("fake", "FAKE", 1_700_000_040_000, 5)
+
+    def test_rows_ignore_ids(self):
+        rows = _candle_rows([{**c, "id": "ignored"} for c in self.candles])
+
+        self.assertEqual(
+            [list(row) for row in rows],
+            [["instrument_id", "timeframe_id", "timestamp", "open", "close", "high", "low", "volume"]] * 5,
+        )
+        self.assertEqual((rows[0]["instrument_id"], rows[0]["timeframe_id"]), (7, 1))
+
+    def test_copies_in_batches(self):
+        connection = FakeRawConnection(FakeCursor())
+        with patch.object(engine, "raw_connection", return_value=connection):
+            store_candles_list(self.candles, batch_size=2)
+
+        cursor = connection._cursor
+        self.assertEqual([len(batch) for batch in cursor.copied], [2, 2, 1])
+        self.assertEqual(
+            [int(row[2]) for batch in cursor.copied for row in batch], [c["timestamp"] for c in self.candles]
+        )
+        merges = [statement for statement in cursor.statements if statement.startswith("INSERT")]
+        self.assertEqual(len(merges), 3)
+        self.assertTrue(all("ON CONFLICT (instrument_id, timeframe_id, timestamp) DO NOTHING" in m for m in merges))
+        self.assertTrue(connection.committed and connection.closed)
+
+    def test_falls_back_to_insert_without_copy(self):
+        connection = FakeRawConnection(CursorWithoutCopy())
+        with patch.object(engine, "raw_connection", return_value=connection), patch.object(
+            import_candles_mode, "_insert_candles"
+        ) as insert_candles:
+            store_candles_list(self.candles, batch_size=2)
+
+        rows, batch_size = insert_candles.call_args.args
+        self.assertEqual([row["timestamp"] for row in rows], [c["timestamp"] for c in self.candles])
+        self.assertEqual(batch_size, 2)
+        self.assertTrue(connection.closed)
+
+    def test_falls_back_to_insert_when_copy_is_not_supported(self):
+        cursor = FakeCursor()
+        cursor.copy_expert = MagicMock(side_effect=engine.dialect.loaded_dbapi.NotSupportedError("no COPY"))
+        connection = FakeRawConnection(cursor)
+        with patch.object(engine, "raw_connection", return_value=connection), patch.object(
+            import_candles_mode, "_insert_candles"
+        ) as insert_candles, patch.object(import_candles_mode, "logger") as logger:
+            store_candles_list(self.candles)
+
+        insert_candles.assert_called_once()
+        logger.warning.assert_called_once_with("Bulk COPY is not supported (no COPY), falling back to INSERT")
+        self.assertTrue(connection.rolled_back and connection.closed)
+
+    def test_programming_errors_are_not_retried_as_inserts(self):
+        cursor = FakeCursor()
+        cursor.copy_expert = MagicMock(side_effect=AttributeError("broken"))
+        with patch.object(engine, "raw_connection", return_value=FakeRawConnection(cursor)), patch.object(
+            import_candles_mode, "_insert_candles"
+        ) as insert_candles:
+            with self.assertRaises(AttributeError):
+                store_candles_list(self.candles)
+        insert_candles.assert_not_called()
+
+
+class TestStoreCandlesInDatabase(TestCase):
+    def setUp(self):
+        try:
+            engine.connect().close()
+        except OperationalError:
+            self.skipTest("needs a Postgres database")
+        self.addCleanup(self.delete_candles, "STORE")
+
+    @staticmethod
+    def delete_candles(symbol: str):
+        with engine.begin() as connection:
+            connection.execute(delete(Candle).where(market_clause("test", symbol, "1m")))
+
+    def test_existing_candles_are_skipped(self):
+        candles = fake_candles("test", "STORE", 1_700_000_040_000, 10)
+        store_candles_list(candles[:6])
+        store_candles_list(candles[4:], batch_size=3)
+        store_candles_list(candles, bulk=False, batch_size=4)
+
+        with engine.connect() as connection:
+            stored = connection.execute(
+                Candle.__table__.select()
+                .with_only_columns(Candle.timestamp)
+                .where(market_clause("test", "STORE", "1m"))
+                .order_by(Candle.timestamp)
+            )
+            self.assertEqual(stored.scalars().all(), [c["timestamp"] for c in candles])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class TestTokenBucket(TestCase):
+    def test_limits_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=1, clock=clock, sleep=clock.sleep)
+
+        for _ in range(5):
+            bucket.acquire()
+
+        self.assertAlmostEqual(clock.now, 2.0)
+
+    def test_refills_while_idle(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+        for _ in range(3):
+            bucket.acquire()
+        self.assertEqual(clock.now, 0)
+
+        clock.now += 10
+        for _ in range(4):
+            bucket.acquire()
+        self.assertAlmostEqual(clock.now, 10.5)
+
+
+class TestRun(TestCase):
+    def setUp(self):
+        self.driver = FakeExchange()
+        patchers = [
+            patch.dict(import_candles_mode.drivers, {"fake": lambda: self.driver}),
+            patch.object(import_candles_mode, "SessionLocal"),
+            patch.object(import_candles_mode, "get_coverage", return_value=[]),
+            patch.object(import_candles_mode, "_import_range"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_closes_its_driver(self):
+        with patch.object(self.driver, "close") as close:
+            run("client", "fake", "fake", "2024-01-02")
+
+        close.assert_called_once_with()
+        self.assertIsInstance(self.driver.limiter, TokenBucket)
+        self.assertEqual(import_candles_mode._import_range.call_args.args[:3], (self.driver, "fake", "FAKE"))
+
+    def test_imports_what_coverage_is_missing(self):
+        start = 1_704_153_600_000  # 2024-01-02
+        minute = 60_000
+        import_candles_mode.get_coverage.return_value = [(start + 10 * minute, start + 19 * minute)]
+        self.driver.starting_time = start + 5 * minute
+        last_complete_minute = arrow.utcnow().floor("minute").int_timestamp * 1000 - minute
+
+        run("client", "fake", "FAKE", "2024-01-02")
+
+        session = import_candles_mode.SessionLocal.return_value.__enter__.return_value
+        import_candles_mode.get_coverage.assert_called_once_with(session, "fake", "FAKE", "1m")
+        (before, after) = [call.args[3:] for call in import_candles_mode._import_range.call_args_list]
+        self.assertEqual(before, (start + 5 * minute, start + 9 * minute, True, True))
+        self.assertEqual(after[0], start + 20 * minute)
+        self.assertIn(after[1], (last_complete_minute, last_complete_minute + minute))
+        self.assertEqual(after[2:], (False, True))
+
+    def test_does_not_request_gaps_again_without_filling(self):
+        start = 1_704_153_600_000
+        minute = 60_000
+        import_candles_mode.get_coverage.return_value = [
+            (start, start + 9 * minute),
+            (start + 20 * minute, start + 29 * minute),
+        ]
+
+        run("client", "fake", "FAKE", "2024-01-02", fill_gaps=False)
+
+        (missing,) = [call.args[3:] for call in import_candles_mode._import_range.call_args_list]
+        self.assertEqual(missing[0], start + 30 * minute)
+        self.assertEqual(missing[2:], (False, False))
+
+    def test_closes_its_driver_on_error(self):
+        import_candles_mode._import_range.side_effect = ConnectionError
+        with patch.object(self.driver, "close") as close, self.assertRaises(ConnectionError):
+            run("client", "fake", "FAKE", "2024-01-02")
+
+        close.assert_called_once_with()
+
+    def test_leaves_a_given_driver_open(self):
+        driver = FakeExchange()
+        with patch.object(driver, "close") as close:
+            run("client", "fake", "FAKE", "2024-01-02", driver=driver)
+
+        close.assert_not_called()
+        self.assertIsNone(driver.limiter)
+        self.assertIs(import_candles_mode._import_range.call_args.args[0], driver)
+
+
+class RecordingTokenBucket(TokenBucket):
+    def __init__(self, rate: float):
+        super().__init__(rate, capacity=rate)
+        self.threads = []
+
+    def acquire(self, tokens: float = 1) -> None:
+        self.threads.append(threading.get_ident())
+        super().acquire(tokens)
+
+
+class ConcurrentFakeExchange(FakeExchange):
+    """A FakeExchange that holds every import until all of ``symbols`` have asked for their starting time."""
+
+    symbols = ["AAA", "BBB", "BROKEN", "CCC"]
+
+    def __init__(self):
+        super().__init__(count=1_000, skip_every=7, starting_time=1_704_067_200_000)  # 2024-01-01
+        self.barrier = threading.Barrier(len(self.symbols), timeout=10)
+
+    def get_starting_time(self, symbol: str) -> int:
+        starting_time = super().get_starting_time(symbol)
+        self.barrier.wait()
+        return starting_time
+
+    def fetch(self, symbol: str, start_timestamp: int, timeframe: str = "1m") -> list:
+        if symbol == "BROKEN":
+            raise ConnectionError("connection reset")
+        return super().fetch(symbol, start_timestamp, timeframe)
+
+
+class TestRunMany(TestCase):
+    def test_imports_symbols_concurrently_under_one_limiter(self):
+        driver = ConcurrentFakeExchange()
+        limiters = []
+        stored = {}
+
+        def token_bucket(rate: float) -> RecordingTokenBucket:
+            limiters.append(RecordingTokenBucket(rate))
+            return limiters[-1]
+
+        def store(candles: list[dict]):
+            stored.setdefault(candles[0]["symbol"], []).extend(candles)
+
+        start_date = arrow.utcnow().shift(days=-1).format("YYYY-MM-DD")
+        with patch.dict(import_candles_mode.drivers, {"fake": lambda: driver}), patch.object(
+            import_candles_mode, "TokenBucket", token_bucket
+        ), patch.object(import_candles_mode, "SessionLocal"), patch.object(
+            import_candles_mode, "get_coverage", return_value=[]
+        ), patch.object(
+            import_candles_mode, "_get_previous_close", return_value=None
+        ), patch.object(
+            import_candles_mode, "store_candles_list", side_effect=store
+        ):
+            errors = run_many("client", "fake", driver.symbols, start_date, max_workers=4)
+
+        self.assertEqual(list(errors), ["BROKEN"])
+        self.assertIsInstance(errors["BROKEN"], ConnectionError)
+        self.assertEqual(sorted(stored), ["AAA", "BBB", "CCC"])
+        first_minute = arrow.get(start_date).int_timestamp * 1000
+        for candles in stored.values():
+            self.assertEqual(candles[0]["timestamp"], first_minute)
+            self.assertEqual(np.diff([c["timestamp"] for c in candles]).tolist(), [60_000] * (len(candles) - 1))
+        # one limiter for the whole run, acquired by every symbol's thread
+        self.assertEqual(len(limiters), 1)
+        self.assertGreater(len(limiters[0].threads), len(driver.symbols))
+        self.assertEqual(len(set(limiters[0].threads)), 4)
+
+
+class TestGetCoverageInDatabase(TestCase):
+    start = 1_700_000_040_000
+
+    def setUp(self):
+        try:
+            engine.connect().close()
+        except OperationalError:
+            self.skipTest("needs a Postgres database")
+        self.addCleanup(TestStoreCandlesInDatabase.delete_candles, "COVERAGE")
+
+    def test_runs_of_stored_candles(self):
+        candles = fake_candles("test", "COVERAGE", self.start, 10)
+        store_candles_list([c for i, c in enumerate(candles) if i not in (3, 4, 7)])
+
+        with SessionLocal() as session:
+            coverage = get_coverage(session, "test", "COVERAGE")
+            self.assertEqual(get_coverage(session, "test", "NOTHING"), [])
+
+        minute = 60_000
+        self.assertEqual(
+            coverage,
+            [
+                (self.start, self.start + 2 * minute),
+                (self.start + 5 * minute, self.start + 6 * minute),
+                (self.start + 8 * minute, self.start + 9 * minute),
+            ],
+        )
+
+
+class TestPlanMissingWindows(TestCase):
+    def test_no_coverage(self):
+        self.assertEqual(plan_missing_windows([], 0, 9 * 60_000), [(0, 9 * 60_000)])
+
+    def test_gaps_between_coverage(self):
+        minute = 60_000
+        coverage = [(5 * minute, 9 * minute), (-10 * minute, 2 * minute), (12 * minute, 12 * minute)]
+        self.assertEqual(
+            plan_missing_windows(coverage, 0, 20 * minute),
+            [(3 * minute, 4 * minute), (10 * minute, 11 * minute), (13 * minute, 20 * minute)],
+        )
+
+    def test_trimmed_to_sessions(self):
+        calendar = NYSECalendar()
+        friday_close = 1_704_488_400_000  # 2024-01-05 16:00 New York
+        monday_open = friday_close + (2 * 24 * 60 + 17 * 60 + 30) * 60_000
+        coverage = [(friday_close - 60 * 60_000, friday_close - 60_000), (monday_open, monday_open + 60_000)]
+
+        self.assertEqual(plan_missing_windows(coverage, friday_close - 60 * 60_000, monday_open, calendar=calendar), [])
+        self.assertEqual(
+            plan_missing_windows(coverage, friday_close - 60 * 60_000, monday_open + 10 * 60_000, calendar=calendar),
+            [(monday_open + 120_000, monday_open + 10 * 60_000)],
+        )
+        self.assertEqual(
+            plan_missing_windows([], friday_close - 120_000, monday_open + 60_000, calendar=calendar),
+            [(friday_close - 120_000, monday_open + 60_000)],
+        )
+
+    def test_fully_covered(self):
+        self.assertEqual(plan_missing_windows([(0, 100 * 60_000)], 10 * 60_000, 50 * 60_000), [])
@@ -3,17 +3,51 @@ from unittest import TestCase
 import numpy as np
 
 import strategy.indicators as si
-from strategy.db.candle import Candle
+from strategy.indicators.incremental import IncrementalADX
+from strategy.store.candles import CandleStore
+from strategy.store.store import Store
+from .conftest import to_db_candles
+from .data import test_candle_indicators as data
 from .data.test_candle_indicators import test_candles_10
 
 
 class TestIndicators(TestCase):
-    @staticmethod
-    def to_db_candles(raw_candles: list[tuple[float]]) -> list[Candle]:
-        return [Candle(timestamp=c[0], high=c[1], low=c[2], close=c[3], open=c[4], volume=c[5]) for c in raw_candles]
-
     def test_adx(self):
-        candles = self.to_db_candles(test_candles_10)
+        candles = to_db_candles(test_candles_10)
         result = si.adx(candles, period=14)
         self.assertIsInstance(result, np.ndarray)
         self.assertEquals(round(result[-1]), 26)
+
+    def test_incremental_adx_matches_talib(self):
+        for raw_candles in (data.test_candles_2, data.test_candles_10, data.test_candles_19, data.test_candles_btc):
+            candles = to_db_candles(raw_candles)
+            for period in (5, 14):
+                indicator = IncrementalADX(period=period)
+                streamed = np.array([indicator.update(c) for c in candles])
+                np.testing.assert_allclose(streamed, si.adx(candles, period=period), equal_nan=True)
+
+    def test_incremental_adx_on_store(self):
+        candles = to_db_candles(test_candles_10)
+        store = Store()
+        indicator = store.register_indicator("adx", IncrementalADX(period=14))
+        for c in candles:
+            store.add_candle(c)
+        self.assertAlmostEqual(indicator.value, si.adx(candles, period=14)[-1])
+        with self.assertRaises(ValueError):
+            store.register_indicator("adx", IncrementalADX())
+
+    def test_adx_is_memoized_per_bar(self):
+        candles = to_db_candles(test_candles_10)
+        store = CandleStore.from_candles(candles[:-1])
+
+        first = si.adx(store, 14)
+        self.assertIs(si.adx(store, period=14), first)
+        self.assertIs(si.adx(store), first)
+        self.assertEqual((store.indicator_memo.hits, store.indicator_memo.misses), (2, 1))
+
+        si.adx(store, period=5)
+        self.assertEqual(store.indicator_memo.misses, 2)
+
+        store.add_candle(candles[-1])
+        np.testing.assert_array_equal(si.adx(store), si.adx(candles))
+        self.assertEqual(store.indicator_memo.misses, 3)
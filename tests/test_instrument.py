@@ -0,0 +1,49 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import strategy.db.instrument as instrument
+from strategy.db.instrument import instrument_id, timeframe_id
+
+
+class TestDictionaryIds(TestCase):
+    def setUp(self):
+        self.engine = MagicMock()
+        self.connection = self.engine.begin.return_value.__enter__.return_value
+        for name, value in {
+            "engine": self.engine,
+            "_instrument_ids": {},
+            "_timeframe_ids": {},
+            "_missing": {},
+        }.items():
+            patcher = patch.object(instrument, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_ids_are_cached(self):
+        self.connection.execute.return_value.scalar.return_value = 3
+
+        self.assertEqual(instrument_id("alpaca", "AAPL"), 3)
+        self.assertEqual(instrument_id("alpaca", "AAPL"), 3)
+        self.assertEqual(self.engine.begin.call_count, 1)
+
+    def test_misses_are_cached_until_created(self):
+        self.connection.execute.return_value.scalar.return_value = None
+
+        self.assertIsNone(timeframe_id("5m"))
+        self.assertIsNone(timeframe_id("5m"))
+        self.assertEqual(self.engine.begin.call_count, 1)
+
+        self.connection.execute.return_value.scalar.return_value = 2
+        self.assertEqual(timeframe_id("5m", create=True), 2)
+        self.assertEqual(timeframe_id("5m"), 2)
+        self.assertEqual(self.engine.begin.call_count, 2)
+
+    def test_misses_expire(self):
+        self.connection.execute.return_value.scalar.return_value = None
+        self.assertIsNone(instrument_id("alpaca", "NEW"))
+
+        self.connection.execute.return_value.scalar.return_value = 9
+        with patch.object(
+            instrument.time, "monotonic", return_value=instrument.time.monotonic() + instrument.MISSING_TTL
+        ):
+            self.assertEqual(instrument_id("alpaca", "NEW"), 9)
@@ -0,0 +1,78 @@
+from datetime import date
+from unittest import TestCase
+
+import arrow
+
+from strategy.market_calendar import AlwaysOpenCalendar, NYSECalendar, nyse_early_closes, nyse_holidays
+
+
+def timestamp(iso: str) -> int:
+    return arrow.get(iso).int_timestamp * 1000
+
+
+class TestNYSECalendar(TestCase):
+    def test_holidays(self):
+        self.assertEqual(
+            sorted(nyse_holidays(2024)),
+            [
+                date(2024, 1, 1),
+                date(2024, 1, 15),
+                date(2024, 2, 19),
+                date(2024, 3, 29),
+                date(2024, 5, 27),
+                date(2024, 6, 19),
+                date(2024, 7, 4),
+                date(2024, 9, 2),
+                date(2024, 11, 28),
+                date(2024, 12, 25),
+            ],
+        )
+        # observed on the Monday after / Friday before, but not for New Year's Day on a Saturday
+        self.assertIn(date(2022, 12, 26), nyse_holidays(2022))
+        self.assertIn(date(2026, 7, 3), nyse_holidays(2026))
+        self.assertNotIn(date(2021, 12, 31), nyse_holidays(2021))
+        self.assertEqual(sorted(nyse_early_closes(2024)), [date(2024, 7, 3), date(2024, 11, 29), date(2024, 12, 24)])
+
+    def test_sessions(self):
+        calendar = NYSECalendar()
+        sessions = calendar.sessions(timestamp("2024-07-01"), timestamp("2024-07-08"))
+
+        self.assertEqual(
+            sessions,
+            [
+                (timestamp("2024-07-01T13:30"), timestamp("2024-07-01T20:00")),
+                (timestamp("2024-07-02T13:30"), timestamp("2024-07-02T20:00")),
+                (timestamp("2024-07-03T13:30"), timestamp("2024-07-03T17:00")),
+                (timestamp("2024-07-05T13:30"), timestamp("2024-07-05T20:00")),
+            ],
+        )
+        # standard time
+        self.assertEqual(
+            NYSECalendar(extended_hours=True).session(date(2024, 12, 2)),
+            (timestamp("2024-12-02T09:00"), timestamp("2024-12-03T01:00")),
+        )
+
+    def test_trading_minutes(self):
+        minutes = NYSECalendar().trading_minutes(timestamp("2024-01-01"), timestamp("2025-01-01"))
+
+        self.assertEqual(len(minutes), 249 * 390 + 3 * 210)
+        self.assertEqual(minutes[0], timestamp("2024-01-02T14:30"))
+        self.assertEqual(minutes[-1], timestamp("2024-12-31T20:59"))
+
+    def test_in_session(self):
+        timestamps = [
+            timestamp("2024-07-03T13:29"),
+            timestamp("2024-07-03T13:30"),
+            timestamp("2024-07-03T16:59"),
+            timestamp("2024-07-03T17:00"),
+            timestamp("2024-07-04T14:00"),
+            timestamp("2024-07-05T14:00"),
+        ]
+
+        self.assertEqual(NYSECalendar().in_session(timestamps).tolist(), [False, True, True, False, False, True])
+        self.assertEqual(NYSECalendar().in_session(timestamps[4:5]).tolist(), [False])
+
+    def test_always_open(self):
+        minutes = AlwaysOpenCalendar().trading_minutes(timestamp("2024-01-01T23:58"), timestamp("2024-01-02T00:01"))
+
+        self.assertEqual(len(minutes), 4)
@@ -0,0 +1,122 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from strategy.indicators.incremental import IncrementalADX
+from strategy.market_calendar import NYSECalendar
+from strategy.store.candles import COLUMNS, CandleStore
+from strategy.store.resample import BarAggregator, resample
+from strategy.store.store import Store
+
+MONDAY = 1_704_672_000_000  # 2024-01-08 00:00 UTC
+
+
+def minute_candles(start: int, count: int, seed: int = 0) -> CandleStore:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(size=count))
+    open_ = close + rng.normal(size=count)
+    return CandleStore.from_arrays(
+        timestamp=start + np.arange(count) * 60_000,
+        open=open_,
+        high=np.maximum(open_, close) + rng.random(count),
+        low=np.minimum(open_, close) - rng.random(count),
+        close=close,
+        volume=rng.integers(0, 1000, count).astype(float),
+    )
+
+
+class TestResample(TestCase):
+    def test_matches_pandas(self):
+        candles = minute_candles(MONDAY + 7 * 60_000, 3 * 24 * 60)
+        frame = pd.DataFrame(
+            {name: getattr(candles, name) for name in ("open", "high", "low", "close", "volume")},
+            index=pd.to_datetime(candles.timestamp, unit="ms"),
+        )
+        aggregations = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+        for timeframe, rule in (("5m", "5min"), ("15m", "15min"), ("1h", "1h"), ("1D", "1D")):
+            bars = resample(candles, timeframe)
+            expected = frame.resample(rule).agg(aggregations)
+            np.testing.assert_array_equal(bars.timestamp, expected.index.as_unit("ms").asi8)
+            for name in aggregations:
+                np.testing.assert_allclose(getattr(bars, name), expected[name], err_msg=f"{timeframe} {name}")
+
+    def test_session_aligned(self):
+        candles = minute_candles(MONDAY, 2 * 24 * 60)
+        calendar = NYSECalendar()
+        session_open = MONDAY + (14 * 60 + 30) * 60_000
+
+        hourly = resample(candles, "1h", calendar)
+        daily = resample(candles, "1D", calendar)
+
+        self.assertEqual(len(hourly), 2 * 7)
+        self.assertEqual(hourly.timestamp[0], session_open)
+        self.assertEqual(hourly.timestamp[6], session_open + 6 * 3_600_000)
+        first_session = slice(14 * 60 + 30, 21 * 60)
+        self.assertEqual(hourly.open[0], candles.open[first_session][0])
+        self.assertEqual(hourly.close[6], candles.close[first_session][-1])
+        np.testing.assert_array_equal(daily.timestamp, [session_open, session_open + 86_400_000])
+        self.assertEqual(daily.high[0], candles.high[first_session].max())
+        self.assertEqual(daily.volume[0], candles.volume[first_session].sum())
+
+    def test_complete_only(self):
+        candles = minute_candles(MONDAY, 12)
+
+        self.assertEqual(len(resample(candles, "5m")), 3)
+        self.assertEqual(len(resample(candles, "5m", complete_only=True)), 2)
+        self.assertEqual(len(resample(candles[:10], "5m", complete_only=True)), 2)
+        self.assertEqual(len(resample(candles[:3], "5m", complete_only=True)), 0)
+
+
+class TestBarAggregator(TestCase):
+    def assert_same_candles(self, actual: CandleStore, expected: CandleStore):
+        for name in COLUMNS:
+            np.testing.assert_allclose(getattr(actual, name), getattr(expected, name), err_msg=name)
+
+    def test_matches_resample(self):
+        candles = minute_candles(MONDAY + 7 * 60_000, 3 * 24 * 60)
+        keep = np.random.default_rng(1).random(len(candles)) < 0.7
+        with_gaps = CandleStore.from_arrays(**{name: getattr(candles, name)[keep] for name in COLUMNS})
+
+        for source in (candles, with_gaps):
+            for timeframe, calendar in (
+                ("5m", None),
+                ("1h", None),
+                ("1D", None),
+                ("1h", NYSECalendar()),
+                ("1D", NYSECalendar()),
+            ):
+                aggregator = BarAggregator(timeframe, calendar)
+                for candle in source.to_candles():
+                    aggregator.update(candle)
+                expected = resample(source, timeframe, calendar)
+                partial = aggregator.partial
+                if partial is not None:
+                    self.assertEqual(partial.timestamp, expected.timestamp[-1])
+                    self.assertAlmostEqual(partial.volume, expected.volume[-1])
+                    expected = expected[:-1]
+                self.assert_same_candles(aggregator.candles, expected)
+
+    def test_completes_on_last_candle(self):
+        aggregator = BarAggregator("5m")
+        completed = [aggregator.update(candle) for candle in minute_candles(MONDAY, 6).to_candles()]
+
+        self.assertEqual([len(bars) for bars in completed], [0, 0, 0, 0, 1, 0])
+        self.assertEqual(completed[4][0].timestamp, MONDAY)
+        self.assertEqual(aggregator.partial.timestamp, MONDAY + 5 * 60_000)
+
+    def test_store_timeframe_indicators(self):
+        candles = minute_candles(MONDAY, 5 * 24 * 60)
+        store = Store(timeframes=["1h"])
+        indicator = store.register_indicator("adx_1h", IncrementalADX(period=5), timeframe="1h")
+        for candle in candles.to_candles():
+            store.add_candle(candle)
+
+        expected = IncrementalADX(period=5)
+        for bar in resample(candles, "1h", complete_only=True).to_candles():
+            expected.update(bar)
+        self.assertEqual(len(store.timeframes["1h"].candles), 5 * 24)
+        self.assertEqual(indicator.value, expected.value)
+        with self.assertRaises(ValueError):
+            store.register_indicator("adx_4h", IncrementalADX(), timeframe="4h")
@@ -1,8 +1,10 @@
 from unittest import TestCase
+from unittest.mock import patch
 
-from strategy.db.base import SessionLocal
 from strategy.db.candle import Candle
 from strategy.modes.backtest_mode import Backtester
+from strategy.store.candles import CandleStore
+from strategy.store.loader import load_candles
 from strategy.strategy import Order, Strategy
 
 
@@ -38,9 +40,6 @@ class TestStrategy(TestCase):
                 low=90,
                 close=105,
                 volume=1000,
-                exchange="NYSE",
-                symbol="AAPL",
-                timeframe="1D",
             ),
             Candle(
                 timestamp=2,
@@ -49,9 +48,6 @@ class TestStrategy(TestCase):
                 low=104,
                 close=110,
                 volume=1000,
-                exchange="NYSE",
-                symbol="AAPL",
-                timeframe="1D",
             ),
             Candle(
                 timestamp=3,
@@ -60,9 +56,6 @@ class TestStrategy(TestCase):
                 low=109,
                 close=115,
                 volume=1000,
-                exchange="NYSE",
-                symbol="AAPL",
-                timeframe="1D",
             ),
             Candle(
                 timestamp=4,
@@ -71,9 +64,6 @@ class TestStrategy(TestCase):
                 low=114,
                 close=120,
                 volume=1000,
-                exchange="NYSE",
-                symbol="AAPL",
-                timeframe="1D",
             ),
         ]
 
@@ -87,9 +77,25 @@ class TestStrategy(TestCase):
         self.assertEqual(backtester.trades[0].exit_price, 120)
         self.assertEqual(backtester.pnl, 120 - 105)
 
+    def test_candle_store_is_backtested_without_orm_objects(self):
+        candles = CandleStore.from_arrays(
+            timestamp=[1, 2, 3, 4],
+            open=[100, 106, 111, 116],
+            high=[110, 115, 120, 125],
+            low=[90, 104, 109, 114],
+            close=[105, 110, 115, 120],
+            volume=[1000] * 4,
+        )
+
+        backtester = Backtester(strategy=ExampleStrategy(), initial_balance=10_000)
+        with patch.object(Candle, "__init__", side_effect=AssertionError("a Candle was constructed")):
+            backtester.backtest(candles)
+
+        self.assertEqual(len(backtester.trades), 1)
+        self.assertEqual(backtester.pnl, 120 - 105)
+
     def test_real_data(self):
-        session = SessionLocal()
-        aapl_candles = session.query(Candle).filter(Candle.symbol == "AAPL").all()
+        aapl_candles = load_candles("alpaca", "AAPL")
         strategy = ExampleStrategy()
         backtester = Backtester(strategy=strategy, initial_balance=10_000)
         backtester.backtest(aapl_candles)
@@ -0,0 +1,101 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+import strategy.indicators as si
+from strategy.db.candle import Candle
+from strategy.metrics import max_drawdown
+from strategy.modes import sweep_mode
+from strategy.modes.sweep_mode import SharedCandles, _attach_shared_candles, _run_backtest, sweep
+from strategy.modes.vectorized_backtest_mode import VectorizedBacktester
+from strategy.store.candles import CandleStore
+from strategy.strategy import Order, Signals, Strategy, VectorizedStrategy
+from .conftest import to_db_candles
+from .data.test_candle_indicators import test_candles_btc
+
+
+class AdxTrendStrategy(VectorizedStrategy):
+    def __init__(self, period: int, threshold: float):
+        self.period = period
+        self.threshold = threshold
+
+    def generate_signals(self, candles: CandleStore) -> Signals:
+        adx = si.adx(candles, period=self.period)
+        trending = np.nan_to_num(adx) > self.threshold
+        rising = np.diff(candles.close, prepend=candles.close[0]) > 0
+        return Signals(long_entries=trending & rising, exits=~trending)
+
+
+class BuyAndHoldStrategy(Strategy):
+    def __init__(self, quantity: float):
+        super().__init__()
+        self.quantity = quantity
+        self.has_bought = False
+
+    def should_long(self) -> bool:
+        return not self.has_bought
+
+    def go_long(self) -> Order:
+        self.has_bought = True
+        return Order(quantity=self.quantity, price=self.store.candles.most_recent_candle.close)
+
+    def should_short(self) -> bool:
+        return False
+
+    def go_short(self) -> None:
+        pass
+
+    def should_cancel_entry(self) -> bool:
+        return False
+
+
+class TestSweep(TestCase):
+    def test_vectorized_sweep_in_processes(self):
+        candles = CandleStore.from_candles(to_db_candles(test_candles_btc))
+        param_grid = {"period": [7, 14], "threshold": [20, 25, 30]}
+
+        results = sweep(AdxTrendStrategy, param_grid, candles, initial_balance=10_000, processes=2)
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(list(results.columns), ["period", "threshold", "pnl", "trades", "max_drawdown", "sharpe"])
+        for row in results.itertuples():
+            backtester = VectorizedBacktester(AdxTrendStrategy(row.period, row.threshold), initial_balance=10_000)
+            backtester.backtest(candles)
+            self.assertAlmostEqual(row.pnl, backtester.pnl)
+            self.assertEqual(row.trades, len(backtester.trades))
+            self.assertAlmostEqual(row.max_drawdown, max_drawdown(backtester.equity_curve))
+
+    def test_event_sweep_in_process(self):
+        candles = to_db_candles(test_candles_btc)
+        results = sweep(BuyAndHoldStrategy, {"quantity": [1, 2]}, candles, processes=1)
+
+        self.assertEqual(results["trades"].tolist(), [1, 1])
+        self.assertAlmostEqual(results["pnl"][1], 2 * results["pnl"][0])
+
+    def test_flat_series_has_no_drawdown_or_returns(self):
+        n = 50
+        candles = CandleStore.from_arrays(
+            timestamp=np.arange(n), open=[100] * n, high=[100] * n, low=[100] * n, close=[100] * n, volume=[1] * n
+        )
+        results = sweep(BuyAndHoldStrategy, {"quantity": [1, 5]}, candles, initial_balance=1000, processes=1)
+
+        self.assertEqual(results["trades"].tolist(), [1, 1])
+        self.assertEqual(results["pnl"].tolist(), [0, 0])
+        self.assertEqual(results["max_drawdown"].tolist(), [0, 0])
+        self.assertEqual(results["sharpe"].tolist(), [0, 0])
+
+    def test_event_backtest_in_worker_reads_shared_columns(self):
+        candles = CandleStore.from_candles(to_db_candles(test_candles_btc))
+        expected = sweep(BuyAndHoldStrategy, {"quantity": [1]}, candles, processes=1)
+
+        with SharedCandles(candles) as shared:
+            _attach_shared_candles(shared.name, len(candles))
+            try:
+                with patch.object(Candle, "__init__", side_effect=AssertionError("a Candle was constructed")):
+                    row = _run_backtest(sweep_mode._worker_candles, BuyAndHoldStrategy, {"quantity": 1}, 100_000, 252)
+            finally:
+                sweep_mode._worker_candles = None
+                sweep_mode._worker_memory.close()
+
+        self.assertAlmostEqual(row["pnl"], expected["pnl"][0])
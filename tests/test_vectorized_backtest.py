@@ -0,0 +1,133 @@
+from unittest import TestCase
+
+import numpy as np
+
+from strategy.db.candle import Candle
+from strategy.modes.backtest_mode import Backtester
+from strategy.modes.vectorized_backtest_mode import VectorizedBacktester
+from strategy.store.candles import CandleStore
+from strategy.strategy import Order, Signals, Strategy, VectorizedStrategy
+from .conftest import to_db_candles
+from .data.test_candle_indicators import test_candles_btc
+
+
+class ReplayStrategy(Strategy):
+    """Event-driven strategy that replays precomputed signals bar by bar."""
+
+    def __init__(self, signals: Signals):
+        super().__init__()
+        self.signals = signals
+
+    @property
+    def i(self) -> int:
+        return len(self.store.candles) - 1
+
+    def _order(self) -> Order:
+        stop_loss = self.signals.stop_loss[self.i]
+        take_profit = self.signals.take_profit[self.i]
+        return Order(
+            quantity=self.signals.quantity,
+            price=self.store.candles.most_recent_candle.close,
+            stop_loss=None if np.isnan(stop_loss) else stop_loss,
+            take_profit=None if np.isnan(take_profit) else take_profit,
+        )
+
+    def should_long(self) -> bool:
+        return bool(self.signals.long_entries[self.i])
+
+    def go_long(self) -> Order:
+        return self._order()
+
+    def should_short(self) -> bool:
+        return bool(self.signals.short_entries[self.i])
+
+    def go_short(self) -> Order:
+        return self._order()
+
+    def should_cancel_entry(self) -> bool:
+        return bool(self.signals.exits[self.i])
+
+
+class FixedSignalsStrategy(VectorizedStrategy):
+    def __init__(self, signals: Signals):
+        self.signals = signals
+
+    def generate_signals(self, candles: CandleStore) -> Signals:
+        return self.signals
+
+
+class TestVectorizedBacktester(TestCase):
+    def random_signals(self, candles: list[Candle], seed: int) -> Signals:
+        rng = np.random.default_rng(seed)
+        n = len(candles)
+        close = np.array([c.close for c in candles])
+        long_entries = rng.random(n) < 0.05
+        short_entries = ~long_entries & (rng.random(n) < 0.05)
+        side = np.where(long_entries, 1, -1)
+        stop_loss = np.where(rng.random(n) < 0.7, close * (1 - side * 0.02), np.nan)
+        take_profit = np.where(rng.random(n) < 0.7, close * (1 + side * 0.03), np.nan)
+        return Signals(
+            long_entries=long_entries,
+            short_entries=short_entries,
+            exits=rng.random(n) < 0.02,
+            quantity=2,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+        )
+
+    def test_matches_event_loop(self):
+        candles = to_db_candles(test_candles_btc)
+        for seed in range(5):
+            signals = self.random_signals(candles, seed)
+
+            expected = Backtester(strategy=ReplayStrategy(signals), initial_balance=10_000)
+            expected.backtest(candles)
+            vectorized = VectorizedBacktester(strategy=FixedSignalsStrategy(signals), initial_balance=10_000)
+            vectorized.backtest(candles)
+
+            self.assertGreater(len(expected.trades), 0)
+            self.assertEqual(vectorized.trades, expected.trades)
+            self.assertAlmostEqual(vectorized.pnl, expected.pnl)
+            np.testing.assert_allclose(vectorized.equity_curve, expected.equity_curve)
+            np.testing.assert_allclose(vectorized.daily_returns, expected.daily_returns)
+
+    def test_equity_marks_open_positions_to_market(self):
+        prices = [100, 101, 102, 103]
+        candles = CandleStore.from_arrays(
+            timestamp=[1, 2, 3, 4], open=prices, high=prices, low=prices, close=prices, volume=[1] * 4
+        )
+        entries = np.array([True, False, False, False])
+        none = np.zeros(4, dtype=np.bool_)
+        no_levels = np.full(4, np.nan)
+        for long_entries, short_entries, equity_curve in [
+            (entries, none, [1000, 1000, 1002, 1004, 1006]),
+            (none, entries, [1000, 1000, 998, 996, 994]),
+        ]:
+            signals = Signals(long_entries, short_entries, none, None, 2, no_levels, no_levels)
+
+            expected = Backtester(strategy=ReplayStrategy(signals), initial_balance=1000)
+            expected.backtest(candles)
+            vectorized = VectorizedBacktester(strategy=FixedSignalsStrategy(signals), initial_balance=1000)
+            vectorized.backtest(candles)
+
+            self.assertEqual(expected.equity_curve, equity_curve)
+            np.testing.assert_array_equal(vectorized.equity_curve, equity_curve)
+            self.assertEqual(expected.balance, equity_curve[-1])
+            self.assertEqual(vectorized.balance, equity_curve[-1])
+
+    def test_position_closed_on_last_candle(self):
+        candles = to_db_candles(test_candles_btc)
+        long_entries = np.zeros(len(candles), dtype=np.bool_)
+        long_entries[0] = True
+        backtester = VectorizedBacktester(strategy=FixedSignalsStrategy(Signals(long_entries=long_entries)))
+        backtester.backtest(candles)
+
+        self.assertEqual(len(backtester.trades), 1)
+        self.assertEqual(backtester.trades[0].entry_price, candles[0].close)
+        self.assertEqual(backtester.trades[0].exit_price, candles[-1].close)
+
+    def test_signal_shape_mismatch(self):
+        candles = to_db_candles(test_candles_btc)
+        backtester = VectorizedBacktester(strategy=FixedSignalsStrategy(Signals(long_entries=np.zeros(3))))
+        with self.assertRaises(ValueError):
+            backtester.backtest(candles)
@@ -0,0 +1,66 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from strategy.db.candle import Candle
+from strategy.modes.vectorized_backtest_mode import VectorizedBacktester
+from strategy.modes.walk_forward_mode import walk_forward, walk_forward_windows
+from strategy.store.candles import CandleStore
+from .conftest import to_db_candles
+from .data.test_candle_indicators import test_candles_btc
+from .test_sweep import AdxTrendStrategy, BuyAndHoldStrategy
+
+
+class CountingAdxTrendStrategy(AdxTrendStrategy):
+    calls = 0
+
+    def generate_signals(self, candles: CandleStore):
+        CountingAdxTrendStrategy.calls += 1
+        return super().generate_signals(candles)
+
+
+class TestWalkForward(TestCase):
+    def test_windows(self):
+        windows = walk_forward_windows(10, in_sample_size=4, out_of_sample_size=2)
+        self.assertEqual(
+            windows,
+            [(slice(0, 4), slice(4, 6)), (slice(2, 6), slice(6, 8)), (slice(4, 8), slice(8, 10))],
+        )
+        self.assertEqual(len(walk_forward_windows(10, 4, 2, step=5)), 1)
+        self.assertEqual(walk_forward_windows(5, 4, 2), [])
+
+    def test_signals_computed_once_per_parameter_set(self):
+        candles = CandleStore.from_candles(to_db_candles(test_candles_btc))
+        param_grid = {"period": [7, 14], "threshold": [20, 30]}
+        CountingAdxTrendStrategy.calls = 0
+
+        results = walk_forward(
+            CountingAdxTrendStrategy, param_grid, candles, in_sample_size=100, out_of_sample_size=50, processes=1
+        )
+
+        self.assertEqual(CountingAdxTrendStrategy.calls, 4)
+        self.assertEqual(len(results), len(walk_forward_windows(len(candles), 100, 50)))
+        row = results.iloc[1]
+        strategy = AdxTrendStrategy(row.period, row.threshold)
+        backtester = VectorizedBacktester(strategy=strategy)
+        backtester.backtest(candles[150:200], signals=strategy.generate_signals(candles)[150:200])
+        self.assertEqual(row.out_of_sample_start, candles.timestamp[150])
+        self.assertAlmostEqual(row.pnl, backtester.pnl)
+        self.assertEqual(row.trades, len(backtester.trades))
+
+    def test_parallel_matches_serial(self):
+        candles = to_db_candles(test_candles_btc)
+        param_grid = {"period": [7, 14], "threshold": [20, 30]}
+        serial = walk_forward(AdxTrendStrategy, param_grid, candles, 100, 50, metric="pnl", processes=1)
+        parallel = walk_forward(AdxTrendStrategy, param_grid, candles, 100, 50, metric="pnl", processes=2)
+        self.assertTrue(serial.equals(parallel))
+
+    def test_event_strategy(self):
+        candles = to_db_candles(test_candles_btc)
+        results = walk_forward(BuyAndHoldStrategy, {"quantity": [1, 2]}, candles, 100, 50, metric="pnl", processes=1)
+        self.assertTrue((results["trades"] == 1).all())
+
+    def test_event_strategy_runs_on_candle_store_windows(self):
+        candles = CandleStore.from_candles(to_db_candles(test_candles_btc))
+        with patch.object(Candle, "__init__", side_effect=AssertionError("a Candle was constructed")):
+            results = walk_forward(BuyAndHoldStrategy, {"quantity": [1]}, candles, 100, 50, processes=1)
+        self.assertTrue((results["trades"] == 1).all())